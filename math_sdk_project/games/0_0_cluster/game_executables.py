@@ -29,8 +29,9 @@ class GameExecutables(GameCalculations):
             update_grid_mult_event(self)
 
     def get_clusters_update_wins(self):
-        """Find clusters on board and update win manager."""
-        clusters = Cluster.get_clusters(self.board, "wild")
+        """Find clusters on board and update win manager. Clusters away from tumbled positions
+        are reused from the previous evaluation."""
+        clusters = self.cluster_labels.get_clusters(self.board)
         return_data = {
             "totalWin": 0,
             "wins": [],
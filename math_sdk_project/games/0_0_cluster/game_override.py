@@ -1,4 +1,5 @@
 from game_executables import GameExecutables
+from src.calculations.cluster import ClusterLabels
 
 
 class GameStateOverride(GameExecutables):
@@ -12,6 +13,8 @@ class GameStateOverride(GameExecutables):
         super().reset_book()
         # Reset parameters relevant to local game only
         self.tumble_win = 0
+        self.reset_grid_mults()
+        self.cluster_labels = ClusterLabels("wild")
 
     def reset_fs_spin(self):
         super().reset_fs_spin()
@@ -2,7 +2,7 @@
 
 from copy import deepcopy
 from src.events.event_constants import EventConstants
-from src.events.events import json_ready_sym
+from src.events.events import book_event, json_ready_sym
 
 NEW_EXP_WILDS = "newExpandingWilds"
 UPDATE_EXP_WILDS = "updateExpandingWilds"
@@ -11,9 +11,10 @@ WIN_DATA = "winInfo"
 PRIZE_WIN_DATA = "prizeWinInfo"
 
 
+@book_event
 def new_expanding_wild_event(gamestate) -> None:
     """Passed after reveal event"""
-    new_exp_wilds = gamestate.new_exp_wilds
+    new_exp_wilds = [dict(ew) for ew in gamestate.new_exp_wilds]
     if gamestate.config.include_padding:
         for ew in new_exp_wilds:
             ew["row"] += 1
@@ -22,6 +23,7 @@ def new_expanding_wild_event(gamestate) -> None:
     gamestate.book.add_event(event)
 
 
+@book_event
 def update_expanding_wild_event(gamestate) -> None:
     """On each reveal - the multiplier value on the expanding wild is updated (sent before reveal)"""
     existing_wild_details = deepcopy(gamestate.expanding_wilds)
@@ -36,6 +38,7 @@ def update_expanding_wild_event(gamestate) -> None:
     gamestate.book.add_event(event)
 
 
+@book_event
 def new_sticky_event(gamestate, new_sticky_syms: list):
     """Pass details on new prize symbols"""
     if gamestate.config.include_padding:
@@ -47,6 +50,7 @@ def new_sticky_event(gamestate, new_sticky_syms: list):
     gamestate.book.add_event(event)
 
 
+@book_event
 def win_info_prize_event(gamestate, include_padding_index=True):
     """
     include_padding_index: starts winning-symbol positions at row=1, to account for top/bottom symbol inclusion in board
@@ -69,6 +73,7 @@ def win_info_prize_event(gamestate, include_padding_index=True):
     gamestate.book.add_event(event)
 
 
+@book_event
 def reveal_prize_event(gamestate):
     """Display the initial board drawn from reelstrips."""
     board_client = []
@@ -94,8 +99,8 @@ def reveal_prize_event(gamestate):
         "index": len(gamestate.book.events),
         "type": EventConstants.REVEAL.value,
         "board": board_client,
-        "paddingPositions": gamestate.reel_positions,
+        "paddingPositions": list(gamestate.reel_positions),
         "gameType": "superspin",
-        "anticipation": gamestate.anticipation,
+        "anticipation": list(gamestate.anticipation),
     }
     gamestate.book.add_event(event)
@@ -19,8 +19,9 @@ class GameExecutables(GameCalculations):
             expwild["mult"] = new_mult_on_reveal
             updated_exp_wild.append({"reel": expwild["reel"], "row": 0, "mult": new_mult_on_reveal})
             for row, _ in enumerate(self.board[expwild["reel"]]):
-                self.board[expwild["reel"]][row] = self.create_symbol("W")
-                self.board[expwild["reel"]][row].assign_attribute({"multiplier": new_mult_on_reveal})
+                wild = self.create_symbol("W")
+                wild.assign_attribute({"multiplier": new_mult_on_reveal})
+                self.set_board_symbol(expwild["reel"], row, wild)
 
     def assign_new_wilds(self, max_num_new_wilds: int):
         """Assign unused reels to have sticky symbol."""
@@ -35,10 +36,9 @@ class GameExecutables(GameCalculations):
                     self.get_current_distribution_conditions()["mult_values"][self.gametype]
                 )
                 expwild_details = {"reel": chosen_reel, "row": chosen_row, "mult": wr_mult}
-                self.board[expwild_details["reel"]][expwild_details["row"]] = self.create_symbol("W")
-                self.board[expwild_details["reel"]][expwild_details["row"]].assign_attribute(
-                    {"multiplier": wr_mult}
-                )
+                wild = self.create_symbol("W")
+                wild.assign_attribute({"multiplier": wr_mult})
+                self.set_board_symbol(expwild_details["reel"], expwild_details["row"], wild)
                 self.new_exp_wilds.append(expwild_details)
 
     # Superspin prize modes
@@ -65,8 +65,9 @@ class GameExecutables(GameCalculations):
     def replace_board_with_stickys(self) -> None:
         """replace with stickys and update special array."""
         for sym in self.sticky_symbols:
-            self.board[sym["reel"]][sym["row"]] = self.create_symbol("P")
-            self.board[sym["reel"]][sym["row"]].assign_attribute({"prize": sym["prize"]})
+            prize = self.create_symbol("P")
+            prize.assign_attribute({"prize": sym["prize"]})
+            self.set_board_symbol(sym["reel"], sym["row"], prize)
 
     def get_final_board_prize(self) -> dict:
         """Get final board win."""
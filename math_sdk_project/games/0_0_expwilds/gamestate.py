@@ -75,14 +75,14 @@ class GameState(GameStateOverride):
             self.update_freespin()
             self.create_board_reelstrips()
             if self.criteria == "0":
-                while len(self.special_syms_on_board["prize"]) > 0:
+                while self.count_special_symbols("prize") > 0:
                     self.create_board_reelstrips()
             elif (
                 self.criteria.upper() == "wincap"
                 and self.win_manager.running_bet_win < 0.95 * self.config.wincap
                 and self.fs <= 1
             ):
-                while len(self.special_syms_on_board["prize"]) == 0:
+                while self.count_special_symbols("prize") == 0:
                     self.create_board_reelstrips()
             self.replace_board_with_stickys()
             reveal_prize_event(self)
@@ -6,7 +6,9 @@ class GameExecutables(GameCalculations):
 
     def evaluate_lines_board(self):
         """Populate win-data, record wins, transmit events."""
-        self.win_data = Lines.get_lines(self.board, self.config, global_multiplier=self.global_multiplier)
+        self.win_data = Lines.get_lines(
+            self.board, self.config, global_multiplier=self.global_multiplier, pattern_cache=self.line_patterns
+        )
         Lines.record_lines_wins(self)
         self.win_manager.update_spinwin(self.win_data["totalWin"])
         Lines.emit_linewin_events(self)
@@ -1,4 +1,5 @@
 from game_executables import GameExecutables
+from src.calculations.lines import LinePatternCache
 from src.calculations.statistics import get_random_outcome
 
 
@@ -8,6 +9,17 @@ class GameStateOverride(GameExecutables):
     e.g: A specific game may have custom book properties to reset
     """
 
+    def __init__(self, config):
+        # Shared by the gamestate copies of every chunk, so line results are reused across all simulations of a process
+        self.line_patterns = LinePatternCache()
+        super().__init__(config)
+
+    def get_shared_objects(self):
+        return super().get_shared_objects() + [self.line_patterns]
+
+    def collect_cache_stats(self):
+        return {"linePatterns": self.line_patterns.pop_stats()}
+
     def reset_book(self):
         super().reset_book()
 
@@ -3,6 +3,7 @@
 import random
 from typing import List
 from src.state.state import GeneralGameState
+from src.config.compiled_model import get_compiled_model
 from src.calculations.statistics import get_random_outcome
 from src.events.events import reveal_event
 
@@ -10,51 +11,20 @@ from src.events.events import reveal_event
 class Board(GeneralGameState):
     """Handles generation of a game board and symbols"""
 
+    _special_syms_view = None
+
     def create_board_reelstrips(self) -> None:
         """Randomly selects stopping positions from a reelstrip."""
-        if self.config.include_padding:
-            top_symbols = []
-            bottom_symbols = []
         self.refresh_special_syms()
         self.reelstrip_id = get_random_outcome(
             self.get_current_distribution_conditions()["reel_weights"][self.gametype]
         )
         self.reelstrip = self.config.reels[self.reelstrip_id]
         anticipation = [0] * self.config.num_reels
-        board = [[]] * self.config.num_reels
-        for i in range(self.config.num_reels):
-            board[i] = [0] * self.config.num_rows[i]
         reel_positions = [random.randrange(0, len(self.reelstrip[reel])) for reel in range(self.config.num_reels)]
-        padding_positions = [0] * self.config.num_reels
-        first_scatter_reel = -1
-        for reel in range(self.config.num_reels):
-            reel_pos = reel_positions[reel]
-            if self.config.include_padding:
-                top_symbols.append(
-                    self.create_symbol(self.reelstrip[reel][(reel_pos - 1) % len(self.reelstrip[reel])])
-                )
-                bottom_symbols.append(
-                    self.create_symbol(
-                        self.reelstrip[reel][(reel_pos + len(board[reel])) % len(self.reelstrip[reel])]
-                    )
-                )
-            for row in range(self.config.num_rows[reel]):
-                sym_id = self.reelstrip[reel][(reel_pos + row) % len(self.reelstrip[reel])]
-                sym = self.create_symbol(sym_id)
-                board[reel][row] = sym
-                if sym.special:
-                    for special_symbol in self.special_syms_on_board:
-                        for s in self.config.special_symbols[special_symbol]:
-                            if board[reel][row].name == s:
-                                self.special_syms_on_board[special_symbol] += [{"reel": reel, "row": row}]
-                                if (
-                                    board[reel][row].check_attribute("scatter")
-                                    and len(self.special_syms_on_board[special_symbol])
-                                    >= self.config.anticipation_triggers[self.gametype]
-                                    and first_scatter_reel == -1
-                                ):
-                                    first_scatter_reel = reel + 1
-            padding_positions[reel] = (reel_positions[reel] + len(board[reel]) + 1) % len(self.reelstrip[reel])
+        board, top_symbols, bottom_symbols, padding_positions, special_cells, first_scatter_reel = (
+            self.create_board_from_windows(reel_positions)
+        )
 
         if first_scatter_reel > -1 and first_scatter_reel != self.config.num_reels:
             count = 1
@@ -67,7 +37,9 @@ class Board(GeneralGameState):
                 raise RuntimeError
 
         self.board = board
-        self.get_special_symbols_on_board()
+        self.refresh_special_syms()
+        for reel, row in special_cells:
+            self.add_special_symbol(reel, row)
         self.reel_positions = reel_positions
         self.padding_position = padding_positions
         self.anticipation = anticipation
@@ -77,55 +49,26 @@ class Board(GeneralGameState):
 
     def force_board_from_reelstrips(self, reelstrip_id: str, force_stop_positions: List[List]) -> None:
         """Creates a gameboard from specified stopping positions."""
-        if self.config.include_padding:
-            top_symbols = []
-            bottom_symbols = []
-        self.refresh_special_syms()
-        self.reelstrip_id = reelstrip_id
-        self.reelstrip = self.config.reels[self.reelstrip_id]
-        anticipation = [0] * self.config.num_reels
-        board = [[]] * self.config.num_reels
-        for i in range(self.config.num_reels):
-            board[i] = [0] * self.config.num_rows[i]
-
+        reelstrip = self.config.reels[reelstrip_id]
         reel_positions = [None] * self.config.num_reels
         for r, s in force_stop_positions.items():
             reel_positions[r] = s - random.randint(0, self.config.num_rows[r] - 1)
         for r, _ in enumerate(reel_positions):
             if reel_positions[r] is None:
-                reel_positions[r] = random.randrange(0, len(self.reelstrip[r]))
+                reel_positions[r] = random.randrange(0, len(reelstrip[r]))
 
-        padding_positions = [0] * self.config.num_reels
-        first_scatter_reel = -1
-        for reel in range(self.config.num_reels):
-            reel_pos = reel_positions[reel]
-            if self.config.include_padding:
-                top_symbols.append(
-                    self.create_symbol(self.reelstrip[reel][(reel_pos - 1) % len(self.reelstrip[reel])])
-                )
-                bottom_symbols.append(
-                    self.create_symbol(
-                        self.reelstrip[reel][(reel_pos + len(board[reel])) % len(self.reelstrip[reel])]
-                    )
-                )
-            for row in range(self.config.num_rows[reel]):
-                sym_id = self.reelstrip[reel][(reel_pos + row) % len(self.reelstrip[reel])]
-                sym = self.create_symbol(sym_id)
-                board[reel][row] = sym
-
-                if sym.special:
-                    for special_symbol in self.special_syms_on_board:
-                        for s in self.config.special_symbols[special_symbol]:
-                            if board[reel][row].name == s:
-                                self.special_syms_on_board[special_symbol] += [{"reel": reel, "row": row}]
-                                if (
-                                    board[reel][row].check_attribute("scatter")
-                                    and len(self.special_syms_on_board[special_symbol])
-                                    >= self.config.anticipation_triggers[self.gametype]
-                                    and first_scatter_reel == -1
-                                ):
-                                    first_scatter_reel = reel + 1
-                padding_positions[reel] = (reel_positions[reel] + len(board[reel]) + 1) % len(self.reelstrip[reel])
+        self.create_board_from_stops(reelstrip_id, reel_positions)
+
+    def create_board_from_stops(self, reelstrip_id: str, reel_positions: List[int]) -> None:
+        """Creates a gameboard with the top row of each reel at the given stop positions."""
+        self.refresh_special_syms()
+        self.reelstrip_id = reelstrip_id
+        self.reelstrip = self.config.reels[self.reelstrip_id]
+        anticipation = [0] * self.config.num_reels
+
+        board, top_symbols, bottom_symbols, padding_positions, _, first_scatter_reel = (
+            self.create_board_from_windows(reel_positions)
+        )
 
         if first_scatter_reel > -1 and first_scatter_reel <= self.config.num_reels:
             count = 1
@@ -141,6 +84,48 @@ class Board(GeneralGameState):
             self.top_symbols = top_symbols
             self.bottom_symbols = bottom_symbols
 
+    def create_board_from_windows(self, reel_positions: List[int]) -> tuple:
+        """
+        Create board (and padding) symbols for the given stop positions of self.reelstrip_id,
+        using the precomputed reel windows of the compiled game model.
+
+        Symbols are created reel by reel, padding symbols first, in the same order as they are read
+        from the reelstrip. Special symbols are recorded in self.special_syms_on_board as they are
+        placed; the reel after which there are enough scatters for anticipation is returned as
+        first_scatter_reel (-1 if there are not).
+        """
+        model = get_compiled_model(self.config)
+        include_padding = self.config.include_padding
+        special_symbols = self.config.special_symbols
+        board = [None] * self.config.num_reels
+        top_symbols, bottom_symbols, special_cells = [], [], []
+        padding_positions = [0] * self.config.num_reels
+        first_scatter_reel = -1
+        for reel in range(self.config.num_reels):
+            window = model.get_reel_window(self.reelstrip_id, reel, reel_positions[reel])
+            if include_padding:
+                top_symbols.append(self.create_symbol(window.top))
+                bottom_symbols.append(self.create_symbol(window.bottom))
+            board[reel] = [self.create_symbol(name) for name in window.symbols]
+            for row in window.special_rows:
+                sym = board[reel][row]
+                special_cells.append((reel, row))
+                for special_symbol in self.special_positions:
+                    for s in special_symbols[special_symbol]:
+                        if sym.name == s:
+                            self.special_positions[special_symbol].add((reel, row))
+                            if (
+                                sym.check_attribute("scatter")
+                                and len(self.special_positions[special_symbol])
+                                >= self.config.anticipation_triggers[self.gametype]
+                                and first_scatter_reel == -1
+                            ):
+                                first_scatter_reel = reel + 1
+            padding_positions[reel] = window.padding_position
+        self._special_syms_view = None
+
+        return board, top_symbols, bottom_symbols, padding_positions, special_cells, first_scatter_reel
+
     def create_symbol(self, name: str) -> object:
         """Create a new symbol and assign relevant attributes."""
         if name not in self.symbol_storage.symbols:
@@ -154,19 +139,51 @@ class Board(GeneralGameState):
 
     def refresh_special_syms(self) -> None:
         """Reset recorded speical symbols on board."""
-        self.special_syms_on_board = {}
-        for s in self.config.special_symbols:
-            self.special_syms_on_board[s] = []
+        self.special_positions = {s: set() for s in self.config.special_symbols}
+        self._special_syms_view = None
+
+    @property
+    def special_syms_on_board(self) -> dict:
+        """Positions of each special symbol type as [{"reel": reel, "row": row}, ...] in board order.
+        Built from special_positions when first requested after the board changed."""
+        if self._special_syms_view is None:
+            self._special_syms_view = {
+                special_type: [{"reel": reel, "row": row} for reel, row in sorted(positions)]
+                for special_type, positions in self.special_positions.items()
+            }
+        return self._special_syms_view
+
+    def add_special_symbol(self, reel: int, row: int) -> None:
+        """Record the board symbol at (reel, row) for every special type it has."""
+        sym = self.board[reel][row]
+        if sym.special:
+            for special_type, positions in self.special_positions.items():
+                if sym.check_attribute(special_type):
+                    positions.add((reel, row))
+        self._special_syms_view = None
+
+    def set_board_symbol(self, reel: int, row: int, symbol: object) -> None:
+        """Place a symbol on the board (e.g. sticky or expanding wilds), updating special symbol positions."""
+        self.board[reel][row] = symbol
+        for positions in self.special_positions.values():
+            positions.discard((reel, row))
+        self.add_special_symbol(reel, row)
 
     def get_special_symbols_on_board(self) -> None:
         """Scans board for any active special symbols."""
         self.refresh_special_syms()
         for reel, _ in enumerate(self.board):
             for row, _ in enumerate(self.board[reel]):
-                if self.board[reel][row].special:
-                    for specialType in list(self.special_syms_on_board.keys()):
-                        if self.board[reel][row].check_attribute(specialType):
-                            self.special_syms_on_board[specialType].append({"reel": reel, "row": row})
+                self.add_special_symbol(reel, row)
+
+    def update_special_symbols_on_reels(self, reels: List[int]) -> None:
+        """Rescan special symbols on the given reels only."""
+        for special_type, positions in self.special_positions.items():
+            self.special_positions[special_type] = {pos for pos in positions if pos[0] not in reels}
+        for reel in reels:
+            for row, _ in enumerate(self.board[reel]):
+                self.add_special_symbol(reel, row)
+        self._special_syms_view = None
 
     def transpose_board_string(self, board_string: List[List[str]]) -> List[List[str]]:
         """Transpose symbol names in the format displayed to the player during the game."""
@@ -217,74 +234,56 @@ class Board(GeneralGameState):
 
     def force_special_board(self, force_criteria: str, num_force_syms: int) -> None:
         """Force a board to have a specified number of symbols.
-        Set a specific type of special symbol on a given number of reels.
         This function is mostly used to set the board so that there is a given number
         of scatter symbols.
 
+        Stop positions are sampled in a single pass from the compiled model's stops_by_count
+        index, so boards follow the distribution of uniformly drawn stops restricted to boards
+        showing exactly num_force_syms target symbols. Stacked target symbols are supported.
+
         Args:
-            force_criteria: The type of symbol to force on the board. (e.g. "scatter")
+            force_criteria: The type of symbol to force on the board (e.g. "scatter"), or a symbol name.
             num_force_syms: The number of symbols to force on the board.
-
-        Note: If it is possible for two target symbols to appear on one reel, this method
-        will not be able to guarantee an exact number of target symbols or actually random
-        reel positions. I.e. Ensure the reels do not have stacked scatter symbols.
-        """
-        while True:
-            self._force_special_board(force_criteria, num_force_syms)
-            if (
-                force_criteria in self.config.special_symbols
-                and self.count_special_symbols(force_criteria) == num_force_syms
-            ):
-                break
-            elif (
-                not (force_criteria in self.config.special_symbols)
-                and self.count_symbols_on_board(force_criteria) == num_force_syms
-            ):
-                break
-
-    def _force_special_board(self, force_criteria: str, num_force_syms: int) -> None:
-        """
-        Helper function for forcing special (or name specific) symbols
         """
         reelstrip_id = get_random_outcome(
             self.get_current_distribution_conditions()["reel_weights"][self.gametype]
         )
-        reelstops = self.get_syms_on_reel(reelstrip_id, force_criteria)
-
-        sym_prob = []
-        for x in range(self.config.num_reels):
-            sym_prob.append(len(reelstops[x]) / len(self.config.reels[reelstrip_id][x]))
-        force_stop_positions = {}
-        while len(force_stop_positions) != num_force_syms:
-            possible_reels = [i for i in range(self.config.num_reels) if sym_prob[i] > 0]
-            possible_probs = [p for p in sym_prob if p > 0]
-            chosen_reel = random.choices(possible_reels, possible_probs)[0]
-            chosen_stop = random.choice(reelstops[chosen_reel])
-            sym_prob[chosen_reel] = 0
-            force_stop_positions[int(chosen_reel)] = int(chosen_stop)
-
-        force_stop_positions = dict(sorted(force_stop_positions.items(), key=lambda x: x[0]))
-        self.force_board_from_reelstrips(reelstrip_id, force_stop_positions)
-
-    def get_syms_on_reel(self, reel_id: str, target_symbol: str) -> List[List]:
-        """Return reelstop positions for a specific symbol name."""
-        reel = self.config.reels[reel_id]
-        reelstop_positions = [[] for _ in range(self.config.num_reels)]
-        for r in range(self.config.num_reels):
-            for s in range(len(reel[r])):
-                if (
-                    target_symbol in self.config.special_symbols
-                    and reel[r][s] in self.config.special_symbols[target_symbol]
-                ):
-                    reelstop_positions[r].append(s)
-                elif reel[r][s] == target_symbol:
-                    reelstop_positions[r].append(s)
-
-        return reelstop_positions
+        stops_by_count = get_compiled_model(self.config).get_stops_by_count(reelstrip_id, force_criteria)
+
+        # board_counts[reel][n]: number of stop combinations of reels reel..num_reels-1 showing n targets
+        num_reels = self.config.num_reels
+        board_counts = [[0] * (num_force_syms + 1) for _ in range(num_reels + 1)]
+        board_counts[num_reels][0] = 1
+        for reel in reversed(range(num_reels)):
+            for n in range(num_force_syms + 1):
+                board_counts[reel][n] = sum(
+                    len(stops) * board_counts[reel + 1][n - k]
+                    for k, stops in stops_by_count[reel].items()
+                    if k <= n
+                )
+        if board_counts[0][num_force_syms] == 0:
+            raise RuntimeError(
+                f"Reelstrip '{reelstrip_id}' cannot show exactly {num_force_syms} '{force_criteria}' symbols."
+            )
+
+        reel_positions, remaining = [], num_force_syms
+        for reel in range(num_reels):
+            choice = random.randrange(board_counts[reel][remaining])
+            for k, stops in stops_by_count[reel].items():
+                if k > remaining:
+                    break
+                combinations = board_counts[reel + 1][remaining - k]
+                if choice < len(stops) * combinations:
+                    reel_positions.append(stops[choice // combinations])
+                    remaining -= k
+                    break
+                choice -= len(stops) * combinations
+
+        self.create_board_from_stops(reelstrip_id, reel_positions)
 
     def count_special_symbols(self, special_sym_criteria: str) -> int:
         "Returns integer number of active symbols of any 'special' kind."
-        return len(self.special_syms_on_board[special_sym_criteria])
+        return len(self.special_positions[special_sym_criteria])
 
     def count_symbols_on_board(self, symbol_name: str) -> int:
         """Count number of sumbols on the board matching the target name."""
@@ -6,6 +6,8 @@ from src.calculations.symbol import Symbol
 from src.config.config import Config
 from src.wins.multiplier_strategy import apply_mult
 
+_board_cells = {}
+
 
 class Cluster:
     """Collection of cluster-evaluation functions."""
@@ -25,26 +27,22 @@ class Cluster:
         return (reel_to_overlay, row_to_overlay)
 
     @staticmethod
-    def get_neighbours(board: list[list[Symbol]], reel: int, row: int, local_checked: list) -> list:
-        """All neighbouring symbols within board range."""
-        neighbours = []
-        if reel > 0:
-            if (reel - 1, row) not in local_checked:
-                neighbours += [(reel - 1, row)]
-                local_checked += [(reel - 1, row)]
-        if reel < len(board) - 1:
-            if (reel + 1, row) not in local_checked:
-                neighbours += [(reel + 1, row)]
-                local_checked += [(reel + 1, row)]
-        if row > 0:
-            if (reel, row - 1) not in local_checked:
-                neighbours += [(reel, row - 1)]
-                local_checked += [(reel, row - 1)]
-        if row < len(board[reel]) - 1:
-            if (reel, row + 1) not in local_checked:
-                neighbours += [(reel, row + 1)]
-                local_checked += [(reel, row + 1)]
-        return neighbours
+    def get_board_cells(reel_lengths: tuple) -> tuple:
+        """(reel, row) of every cell in board order, and the flat indices of each cell's neighbours
+        in search order (left, right, up, down). Cached per board shape."""
+        if reel_lengths not in _board_cells:
+            cells = [(reel, row) for reel, num_rows in enumerate(reel_lengths) for row in range(num_rows)]
+            cell_index = {cell: idx for idx, cell in enumerate(cells)}
+            neighbours = [
+                [
+                    cell_index[n]
+                    for n in [(reel - 1, row), (reel + 1, row), (reel, row - 1), (reel, row + 1)]
+                    if n in cell_index
+                ]
+                for reel, row in cells
+            ]
+            _board_cells[reel_lengths] = (cells, neighbours)
+        return _board_cells[reel_lengths]
 
     @staticmethod
     def in_cluster(board: list[list[Symbol]], reel: int, row: int, og_symbol: str, wild_key: str = "wild") -> bool:
@@ -53,57 +51,60 @@ class Cluster:
             return True
 
     @staticmethod
-    def check_all_neighbours(
-        board: Board,
-        already_checked: list,
-        local_checked: list,
-        potential_cluster: list,
-        reel,
-        row,
-        og_symbol: str,
-        wild_key: str = "wild",
-    ):
-        """Recursively check neighbours for like-symbols."""
-        neighbours = Cluster.get_neighbours(board, reel, row, local_checked)
-        for reel_, row_ in neighbours:
-            if Cluster.in_cluster(board, reel_, row_, og_symbol, wild_key):
-                potential_cluster += [(reel_, row_)]
-                already_checked += [(reel_, row_)]
-                Cluster.check_all_neighbours(
-                    board,
-                    already_checked,
-                    local_checked,
-                    potential_cluster,
-                    reel_,
-                    row_,
-                    og_symbol,
-                    wild_key,
-                )
+    def claim_neighbours(neighbours: list, local_checked: list, cluster_id: int) -> list:
+        """Neighbours not yet checked for this cluster, marking them as checked."""
+        unchecked = [cell for cell in neighbours if local_checked[cell] != cluster_id]
+        for cell in unchecked:
+            local_checked[cell] = cluster_id
+        return unchecked
 
     @staticmethod
     def get_clusters(board: list[list[Symbol]], wild_key: str = "wild") -> dict:
-        """Return all symbol clusters of size >= 1."""
-        already_checked = []
-        clusters = defaultdict(list)
-        for reel, _ in enumerate(board):
-            for row, _ in enumerate(board[reel]):
-                if (reel, row) not in already_checked and not (board[reel][row].check_attribute(wild_key)):
-                    potential_cluster = [(reel, row)]
-                    already_checked += [(reel, row)]
-                    local_checked = [(reel, row)]
-                    symbol = board[reel][row].name
-                    Cluster.check_all_neighbours(
-                        board,
-                        already_checked,
-                        local_checked,
-                        potential_cluster,
-                        reel,
-                        row,
-                        symbol,
-                        wild_key,
-                    )
-                    clusters[symbol].append(potential_cluster)
+        """
+        Return all symbol clusters of size >= 1.
+
+        Iterative depth-first flood fill over flat cell indices. Each cluster claims a cell's unchecked
+        neighbours when the cell is reached and then follows matching neighbours in turn, so positions
+        are listed in the same order as a recursive search. Wilds are only marked per cluster, so they
+        can join clusters of several symbols.
+        """
+        cells, neighbours = Cluster.get_board_cells(tuple(len(reel) for reel in board))
+        names = [board[reel][row].name for reel, row in cells]
+        wilds = [board[reel][row].check_attribute(wild_key) for reel, row in cells]
+        found = Cluster.fill_clusters(names, wilds, neighbours, bytearray(len(cells)))
+        return Cluster.group_clusters(found, cells)
+
+    @staticmethod
+    def fill_clusters(names: list, wilds: list, neighbours: list, already_checked: bytearray) -> list:
+        """(start cell, symbol, cluster cells) of every cluster starting from a cell not already checked."""
+        local_checked = [-1] * len(names)
+        found = []
+        for start, symbol in enumerate(names):
+            if already_checked[start] or wilds[start]:
+                continue
+            already_checked[start] = 1
+            local_checked[start] = start
+            potential_cluster = [start]
+            stack = [iter(Cluster.claim_neighbours(neighbours[start], local_checked, start))]
+            while stack:
+                for cell in stack[-1]:
+                    if wilds[cell] or names[cell] == symbol:
+                        potential_cluster.append(cell)
+                        already_checked[cell] = 1
+                        stack.append(iter(Cluster.claim_neighbours(neighbours[cell], local_checked, start)))
+                        break
+                else:
+                    stack.pop()
+            found.append((start, symbol, potential_cluster))
+
+        return found
 
+    @staticmethod
+    def group_clusters(found: list, cells: list) -> dict:
+        """Clusters by symbol as (reel, row) lists, in order of their start cell."""
+        clusters = defaultdict(list)
+        for _, symbol, cluster_cells in found:
+            clusters[symbol].append([cells[cell] for cell in cluster_cells])
         return clusters
 
     @staticmethod
@@ -198,3 +199,51 @@ class Cluster:
                     "gametype": gamestate.gametype,
                 }
             )
+
+
+class ClusterLabels:
+    """
+    Clusters of the last evaluated board, kept between evaluations (i.e. tumbles).
+
+    Symbol names and wild flags of the previous board are compared with the new board. Clusters
+    without changed cells or changed neighbours cannot have gained or lost cells, so they are kept
+    and only the remaining cells are flood filled again. The result is identical to get_clusters.
+    Boards where most cells changed (a new reveal) are evaluated in full.
+    """
+
+    def __init__(self, wild_key: str = "wild"):
+        self.wild_key = wild_key
+        self.reel_lengths = None
+        self.names = []
+        self.wilds = []
+        self.found = []
+
+    def get_clusters(self, board: list[list[Symbol]]) -> dict:
+        """Return all symbol clusters of size >= 1, re-evaluating only clusters near changed cells."""
+        reel_lengths = tuple(len(reel) for reel in board)
+        cells, neighbours = Cluster.get_board_cells(reel_lengths)
+        names = [board[reel][row].name for reel, row in cells]
+        wilds = [board[reel][row].check_attribute(self.wild_key) for reel, row in cells]
+
+        already_checked = bytearray(len(cells))
+        kept = []
+        if reel_lengths == self.reel_lengths:
+            prev_names, prev_wilds = self.names, self.wilds
+            changed = [
+                cell for cell in range(len(cells)) if names[cell] != prev_names[cell] or wilds[cell] != prev_wilds[cell]
+            ]
+            if len(changed) < len(cells) // 2:
+                dirty = set(changed)
+                for cell in changed:
+                    dirty.update(neighbours[cell])
+                for cluster in self.found:
+                    if dirty.isdisjoint(cluster[2]):
+                        kept.append(cluster)
+                        for cell in cluster[2]:
+                            already_checked[cell] = 1
+
+        found = Cluster.fill_clusters(names, wilds, neighbours, already_checked)
+        if kept:
+            found = sorted(kept + found, key=lambda cluster: cluster[0])
+        self.reel_lengths, self.names, self.wilds, self.found = reel_lengths, names, wilds, found
+        return Cluster.group_clusters(found, cells)
@@ -1,7 +1,11 @@
 """Evaluates and records winds for lines games."""
 
-from src.calculations.symbol import Symbol
+from operator import itemgetter
+from typing import NamedTuple
+import numpy as np
+from src.calculations.symbol import Symbol, get_attribute_bit
 from src.config.config import Config
+from src.config.compiled_model import get_compiled_model
 from src.wins.multiplier_strategy import apply_mult
 from src.events.events import (
     win_info_event,
@@ -10,6 +14,16 @@ from src.events.events import (
 )
 
 
+class LineBatchWins(NamedTuple):
+    """Line wins for a batch of boards, arrays indexed by [board, line] in the order of config.paylines."""
+
+    symbol_ids: np.ndarray
+    kinds: np.ndarray
+    base_pays: np.ndarray
+    wild_pays: np.ndarray
+    pays: np.ndarray
+
+
 class Lines:
     """Collection of functions to handle line-win games."""
 
@@ -32,88 +46,222 @@ class Lines:
         wild_sym: str = "W",
         multiplier_method: str = "symbol",
         global_multiplier: int = 1,
+        pattern_cache: "LinePatternCache" = None,
     ):
-        """More efficient lines calculation"""
+        """More efficient lines calculation. Line results are reused from pattern_cache if one is passed."""
+        if pattern_cache is not None:
+            return pattern_cache.get_lines(board, config, wild_key, wild_sym, multiplier_method, global_multiplier)
+
         return_data = {
             "totalWin": 0,
             "wins": [],
         }
 
+        line_matches = Lines.match_paylines(board, config, wild_key)
         for line_index in config.paylines.keys():
-            line = config.paylines[line_index]
-            first_sym = board[0][line[0]]
-            finished_wild_win = False if first_sym.check_attribute(wild_key) else True
-            first_non_wild = first_sym if finished_wild_win else None
-            potential_line = [first_sym]
-
-            wild_matches = 0 * (finished_wild_win) + 1 * (not (finished_wild_win))
-            matches = 1 * (finished_wild_win) + 0 * (not (finished_wild_win))
-            base_win, wild_win = 0, 0
-
-            for reel in range(1, len(line)):
-                sym = board[reel][line[reel]]
-                if finished_wild_win:
-                    if sym.name == first_non_wild.name or sym.check_attribute(wild_key):
-                        matches += 1
-                    else:
-                        break
+            win_dict = Lines.get_line_win(
+                board,
+                config,
+                line_index,
+                line_matches[line_index],
+                wild_sym,
+                multiplier_method,
+                global_multiplier,
+            )
+            if win_dict is not None:
+                return_data["totalWin"] += win_dict["win"]
+                return_data["wins"].append(win_dict)
+
+        return return_data
+
+    @staticmethod
+    def get_line_win(
+        board: list[list[Symbol]],
+        config: Config,
+        line_index: int,
+        line_match: tuple,
+        wild_sym: str = "W",
+        multiplier_method: str = "symbol",
+        global_multiplier: int = 1,
+    ):
+        """Win details of a single payline from its (wild_matches, matches, first_non_wild), None if it does not win."""
+        line = config.paylines[line_index]
+        wild_matches, matches, first_non_wild = line_match
+        base_win, wild_win = 0, 0
+
+        if (wild_matches, wild_sym) in config.paytable:
+            wild_win = config.paytable[(wild_matches, wild_sym)]
+        if first_non_wild is not None:
+            if (wild_matches + matches, first_non_wild.name) in config.paytable:
+                base_win = config.paytable[(wild_matches + matches, first_non_wild.name)]
+
+        if base_win > 0 or wild_win > 0:
+            if wild_win > base_win:
+                symbol, kind, win_without_mult = board[0][line[0]].name, wild_matches, wild_win
+            else:
+                symbol, kind, win_without_mult = first_non_wild.name, matches + wild_matches, base_win
+            positions = [{"reel": idx, "row": line[idx]} for idx in range(0, kind)]
+            line_win, applied_mult = apply_mult(
+                board, multiplier_method, win_amount=win_without_mult, positions=positions
+            )
+            return Lines.line_win_info(
+                symbol,
+                kind,
+                line_win,
+                positions,
+                {
+                    "lineIndex": line_index,
+                    "multiplier": applied_mult,
+                    "winWithoutMult": win_without_mult,
+                    "globalMult": int(global_multiplier),
+                    "lineMultiplier": int(applied_mult / global_multiplier),
+                },
+            )
+        return None
+
+    @staticmethod
+    def match_line(board: list[list[Symbol]], line: list, wild_key: str = "wild") -> tuple:
+        """Leading (wild_matches, matches, first_non_wild) of a single payline."""
+        wild_matches, matches, first_non_wild = 0, 0, None
+        for reel, row in enumerate(line):
+            sym = board[reel][row]
+            if first_non_wild is None:
+                if sym.check_attribute(wild_key):
+                    wild_matches += 1
                 else:
-                    if sym.check_attribute(wild_key) and first_non_wild is None:
-                        wild_matches += 1
-                    elif first_non_wild is None:
-                        first_non_wild = sym
-                        matches += 1
-                        finished_wild_win = True
+                    first_non_wild, matches = sym, matches + 1
+            elif sym.name == first_non_wild.name or sym.check_attribute(wild_key):
+                matches += 1
+            else:
+                break
+        return wild_matches, matches, first_non_wild
+
+    @staticmethod
+    def match_paylines(board: list[list[Symbol]], config: Config, wild_key: str = "wild") -> dict:
+        """
+        Leading (wild_matches, matches, first_non_wild) of every payline. The payline trie of the
+        compiled model is walked once, so positions shared by several line prefixes are only
+        matched once. Once a prefix stops matching, the result holds for all lines through it.
+        """
+        line_matches = {}
+        stack = [(node, None) for node in reversed(get_compiled_model(config).payline_trie)]
+        while stack:
+            node, state = stack.pop()
+            sym = board[node.reel][node.row]
+            if state is None:
+                state = (1, 0, None) if sym.check_attribute(wild_key) else (0, 1, sym)
+            else:
+                wild_matches, matches, first_non_wild = state
+                if first_non_wild is not None:
+                    if sym.name == first_non_wild.name or sym.check_attribute(wild_key):
+                        state = (wild_matches, matches + 1, first_non_wild)
                     else:
-                        break
-                potential_line.append(sym)
-
-            if (wild_matches, wild_sym) in config.paytable:
-                wild_win = config.paytable[(wild_matches, wild_sym)]
-            if first_non_wild is not None:
-                if (wild_matches + matches, first_non_wild.name) in config.paytable:
-                    base_win = config.paytable[(wild_matches + matches, first_non_wild.name)]
-
-            if base_win > 0 or wild_win > 0:
-                if wild_win > base_win:
-                    positions = [{"reel": idx, "row": line[idx]} for idx in range(0, wild_matches)]
-                    line_win, applied_mult = apply_mult(
-                        board, multiplier_method, win_amount=wild_win, positions=positions
-                    )
-                    win_dict = Lines.line_win_info(
-                        potential_line[0].name,
-                        wild_matches,
-                        line_win,
-                        positions,
-                        {
-                            "lineIndex": line_index,
-                            "multiplier": applied_mult,
-                            "winWithoutMult": wild_win,
-                            "globalMult": int(global_multiplier),
-                            "lineMultiplier": int(applied_mult / global_multiplier),
-                        },
-                    )
+                        for line_index in node.lines:
+                            line_matches[line_index] = state
+                        continue
+                elif sym.check_attribute(wild_key):
+                    state = (wild_matches + 1, matches, None)
                 else:
-                    positions = [{"reel": idx, "row": line[idx]} for idx in range(0, matches + wild_matches)]
-                    line_win, applied_mult = apply_mult(
-                        board, multiplier_method, win_amount=base_win, positions=positions
-                    )
-                    win_dict = Lines.line_win_info(
-                        first_non_wild.name,
-                        matches + wild_matches,
-                        line_win,
-                        positions,
-                        {
-                            "lineIndex": line_index,
-                            "multiplier": applied_mult,
-                            "winWithoutMult": base_win,
-                            "globalMult": int(global_multiplier),
-                            "lineMultiplier": int(applied_mult / global_multiplier),
-                        },
-                    )
+                    state = (wild_matches, matches + 1, sym)
 
-                return_data["totalWin"] += line_win
-                return_data["wins"].append(win_dict)
+            if node.children:
+                stack.extend((child, state) for child in reversed(node.children))
+            else:
+                for line_index in node.lines:
+                    line_matches[line_index] = state
+
+        return line_matches
+
+    @staticmethod
+    def get_lines_batch(
+        boards: np.ndarray,
+        config: Config,
+        wild_key: str = "wild",
+        wild_sym: str = "W",
+    ) -> LineBatchWins:
+        """
+        Evaluate every payline of an (N, reels, rows) array of compiled symbol ids at once.
+
+        Follows get_lines: base_pays are for the first non-wild symbol with wild substitution,
+        wild_pays for the leading wilds alone, and the larger of the two gives the winning symbol
+        and kind (the first symbol of the line for wild-only wins). Multipliers are not applied.
+        """
+        model = get_compiled_model(config)
+        boards = np.asarray(boards)
+        num_reels = model.num_reels
+        line_syms = boards[:, np.arange(num_reels), model.paylines]
+        is_wild = (model.symbol_flags[line_syms] & model.get_special_mask(wild_key)) != 0
+
+        wild_kinds = np.cumprod(is_wild, axis=2).sum(axis=2)
+        first_non_wild = np.take_along_axis(line_syms, np.minimum(wild_kinds, num_reels - 1)[..., None], axis=2)
+        kinds = np.cumprod((line_syms == first_non_wild) | is_wild, axis=2).sum(axis=2)
+        first_non_wild = first_non_wild[..., 0]
+
+        pay_array = np.zeros((len(model.symbol_names), num_reels + 1))
+        num_kinds = min(num_reels, model.max_kind) + 1
+        pay_array[:, :num_kinds] = model.pay_array[:, :num_kinds]
+        base_pays = np.where(wild_kinds < num_reels, pay_array[first_non_wild, kinds], 0.0)
+        if wild_sym in model.symbol_ids:
+            wild_pays = pay_array[model.symbol_ids[wild_sym], wild_kinds]
+        else:
+            wild_pays = np.zeros(base_pays.shape)
+
+        wild_wins = wild_pays > base_pays
+        return LineBatchWins(
+            symbol_ids=np.where(wild_wins, line_syms[..., 0], first_non_wild),
+            kinds=np.where(wild_wins, wild_kinds, kinds),
+            base_pays=base_pays,
+            wild_pays=wild_pays,
+            pays=np.maximum(base_pays, wild_pays),
+        )
+
+    @staticmethod
+    def get_batch_win_data(
+        batch: LineBatchWins,
+        board_index: int,
+        board: list[list[Symbol]],
+        config: Config,
+        wild_sym: str = "W",
+        multiplier_method: str = "symbol",
+        global_multiplier: int = 1,
+    ) -> dict:
+        """get_lines output for one board of a batch, building win details only for winning lines."""
+        return_data = {
+            "totalWin": 0,
+            "wins": [],
+        }
+        model = get_compiled_model(config)
+        line_ids = list(config.paylines.keys())
+        for line_pos in np.flatnonzero(batch.pays[board_index] > 0):
+            line_index = line_ids[line_pos]
+            line = config.paylines[line_index]
+            kind = int(batch.kinds[board_index, line_pos])
+            symbol = model.symbol_names[batch.symbol_ids[board_index, line_pos]]
+            if batch.wild_pays[board_index, line_pos] > batch.base_pays[board_index, line_pos]:
+                win_without_mult = config.paytable[(kind, wild_sym)]
+            else:
+                win_without_mult = config.paytable[(kind, symbol)]
+
+            positions = [{"reel": idx, "row": line[idx]} for idx in range(0, kind)]
+            line_win, applied_mult = apply_mult(
+                board, multiplier_method, win_amount=win_without_mult, positions=positions
+            )
+            return_data["totalWin"] += line_win
+            return_data["wins"].append(
+                Lines.line_win_info(
+                    symbol,
+                    kind,
+                    line_win,
+                    positions,
+                    {
+                        "lineIndex": line_index,
+                        "multiplier": applied_mult,
+                        "winWithoutMult": win_without_mult,
+                        "globalMult": int(global_multiplier),
+                        "lineMultiplier": int(applied_mult / global_multiplier),
+                    },
+                )
+            )
 
         return return_data
 
@@ -136,3 +284,150 @@ class Lines:
 
         for win in gamestate.win_data["wins"]:
             record_line(len(win["positions"]), win["symbol"], win["meta"]["multiplier"], gamestate.gametype)
+
+
+class LinePatternCache:
+    """
+    Bounded cache of payline results keyed by the symbols along the line.
+
+    A line's win only depends on its symbol names, which of them are wild and the multiplier method.
+    Lines with a symbol multiplier above 1 are always evaluated (and counted as skipped).
+    Once max_size patterns are stored no new ones are added. hits, misses and skipped count line
+    evaluations since the cache was created or last cleared.
+    """
+
+    def __init__(self, max_size: int = 100000, multiplier_key: str = "multiplier"):
+        self.max_size = max_size
+        self.multiplier_key = multiplier_key
+        self.patterns = {}
+        self.settings = None
+        self.line_cells = []
+        self.hits, self.misses, self.skipped = 0, 0, 0
+
+    def clear(self) -> None:
+        """Remove all patterns and reset the counters."""
+        self.patterns = {}
+        self.settings = None
+        self.hits, self.misses, self.skipped = 0, 0, 0
+
+    def hit_rate(self) -> float:
+        """Fraction of cacheable line evaluations answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_stats(self) -> dict:
+        """Counters and hit rate."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hitRate": self.hit_rate(),
+            "patterns": len(self.patterns),
+        }
+
+    def pop_stats(self) -> dict:
+        """Counters and hit rate, after which the counters are reset. Stored patterns are kept."""
+        stats = self.get_stats()
+        self.hits, self.misses, self.skipped = 0, 0, 0
+        return stats
+
+    def get_lines(
+        self,
+        board: list[list[Symbol]],
+        config: Config,
+        wild_key: str = "wild",
+        wild_sym: str = "W",
+        multiplier_method: str = "symbol",
+        global_multiplier: int = 1,
+    ) -> dict:
+        """Lines.get_lines, reusing the results of previously seen line patterns."""
+        settings = (config, wild_key, wild_sym, multiplier_method)
+        if settings != self.settings:
+            self.patterns = {}
+            self.settings = settings
+            reel_offsets = [sum(config.num_rows[:reel]) for reel in range(config.num_reels)]
+            self.line_cells = [
+                (line_index, line, itemgetter(*[reel_offsets[reel] + row for reel, row in enumerate(line)]))
+                for line_index, line in config.paylines.items()
+            ]
+
+        # Cell code: name, (name,) for wilds, None for symbols with a multiplier value above 1
+        wild_bit, mult_bit = get_attribute_bit(wild_key), get_attribute_bit(self.multiplier_key)
+        codes = []
+        for reel in board:
+            for sym in reel:
+                if not sym.flags & (wild_bit | mult_bit):
+                    codes.append(sym.name)
+                elif sym.flags & mult_bit and sym.get_attribute(self.multiplier_key) > 1:
+                    codes.append(None)
+                elif sym.flags & wild_bit:
+                    codes.append((sym.name,))
+                else:
+                    codes.append(sym.name)
+
+        return_data = {
+            "totalWin": 0,
+            "wins": [],
+        }
+        patterns = self.patterns
+        for line_index, line, get_cells in self.line_cells:
+            pattern = get_cells(codes)
+            if None in pattern:
+                self.skipped += 1
+                win_dict = Lines.get_line_win(
+                    board,
+                    config,
+                    line_index,
+                    Lines.match_line(board, line, wild_key),
+                    wild_sym,
+                    multiplier_method,
+                    global_multiplier,
+                )
+            elif pattern in patterns:
+                self.hits += 1
+                cached = patterns[pattern]
+                if cached is None:
+                    continue
+                symbol, kind, line_win, applied_mult, win_without_mult = cached
+                win_dict = Lines.line_win_info(
+                    symbol,
+                    kind,
+                    line_win,
+                    [{"reel": idx, "row": line[idx]} for idx in range(0, kind)],
+                    {
+                        "lineIndex": line_index,
+                        "multiplier": applied_mult,
+                        "winWithoutMult": win_without_mult,
+                        "globalMult": int(global_multiplier),
+                        "lineMultiplier": int(applied_mult / global_multiplier),
+                    },
+                )
+            else:
+                self.misses += 1
+                win_dict = Lines.get_line_win(
+                    board,
+                    config,
+                    line_index,
+                    Lines.match_line(board, line, wild_key),
+                    wild_sym,
+                    multiplier_method,
+                    global_multiplier,
+                )
+                if len(patterns) < self.max_size:
+                    patterns[pattern] = (
+                        None
+                        if win_dict is None
+                        else (
+                            win_dict["symbol"],
+                            win_dict["kind"],
+                            win_dict["win"],
+                            win_dict["meta"]["multiplier"],
+                            win_dict["meta"]["winWithoutMult"],
+                        )
+                    )
+
+            if win_dict is not None:
+                return_data["totalWin"] += win_dict["win"]
+                return_data["wins"].append(win_dict)
+
+        return return_data
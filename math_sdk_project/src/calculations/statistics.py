@@ -1,11 +1,93 @@
 import random
+from bisect import bisect_left
 from typing import Union
 
 
+class DistributionSampler:
+    """
+    Precomputed sampler for a distribution passed as a dictionary: {value : weight, ...}
+
+    With exact_rng, cumulative weights are searched with bisect, using the same random draw as the
+    linear search in get_random_outcome, so the same outcomes are returned from the same RNG state.
+    Otherwise a Walker alias table is used, which is O(1) per draw but returns different outcomes.
+    """
+
+    def __init__(self, distribution: dict, exact_rng: bool = True):
+        self.values = list(distribution.keys())
+        self.exact_rng = exact_rng
+        self.total_weight = sum(distribution.values())
+        self.cumulative = []
+        cumulative = 0.0
+        for weight in distribution.values():
+            cumulative += weight
+            self.cumulative.append(cumulative)
+        if not exact_rng:
+            self.make_alias_table(list(distribution.values()))
+
+    def make_alias_table(self, weights: list) -> None:
+        """Vose's construction of the alias table, probabilities scaled so their mean is 1."""
+        num_values = len(weights)
+        scaled = [w * num_values / self.total_weight for w in weights]
+        self.probability = [1.0] * num_values
+        self.alias = list(range(num_values))
+        small = [idx for idx, p in enumerate(scaled) if p < 1.0]
+        large = [idx for idx, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self) -> Union[float, int]:
+        """Draw a single value."""
+        if self.exact_rng:
+            idx = bisect_left(self.cumulative, random.uniform(0, self.total_weight))
+            if idx == len(self.values):
+                return Exception("error drawing item from distribution")
+            return self.values[idx]
+        roll = random.random() * len(self.values)
+        idx = int(roll)
+        if roll - idx < self.probability[idx]:
+            return self.values[idx]
+        return self.values[self.alias[idx]]
+
+
+_samplers = {}
+
+
+def cache_samplers(conditions: dict, exact_rng: bool = True) -> None:
+    """Create samplers for all {value: weight} dictionaries within (nested) distribution conditions.
+    get_random_outcome() will use the sampler whenever it is passed one of these dictionaries,
+    which therefore must not be modified afterwards."""
+    for value in conditions.values():
+        if isinstance(value, dict) and len(value) > 0:
+            if all(isinstance(w, (int, float)) and not isinstance(w, bool) for w in value.values()):
+                cached = _samplers.get(id(value))
+                if cached is None or cached[0] is not value or cached[1].exact_rng != exact_rng:
+                    _samplers[id(value)] = (value, DistributionSampler(value, exact_rng))
+            else:
+                cache_samplers(value, exact_rng)
+
+
+def get_sampler(distribution: dict) -> Union[DistributionSampler, None]:
+    """Cached sampler of a distribution dictionary, if there is one."""
+    cached = _samplers.get(id(distribution))
+    if cached is not None and cached[0] is distribution:
+        return cached[1]
+    return None
+
+
 def get_random_outcome(distribution: dict, totalWeight: float = None) -> Union[float, int]:
     """Returns a value from a distibution passed as a dictionary: {value : weight, ...}"""
     assert isinstance(distribution, dict), "distribution must be of type: dict "
     if totalWeight is None:
+        sampler = get_sampler(distribution)
+        if sampler is not None:
+            return sampler.sample()
         totalWeight = sum(distribution.values())
     roll = random.uniform(0, totalWeight)
     cumulative = 0.0
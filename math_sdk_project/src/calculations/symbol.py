@@ -1,10 +1,15 @@
 """Handle symbol classes and initial generation."""
 
+import sys
 from typing import Dict
 
 
 class SymbolStorage:
-    """Initial symbol generation from configuration file."""
+    """Initial symbol generation from configuration file.
+
+    `symbols` holds one prototype per symbol name, with special properties and paytable details
+    computed once. Prototypes are never placed on the board, so must not be modified.
+    """
 
     def __init__(self, config: object, all_symbols: list):
         self.config = config
@@ -13,37 +18,90 @@ class SymbolStorage:
             self.symbols[symbol] = Symbol(self.config, symbol)
 
     def create_symbol_state(self, symbol_name: str) -> object:
-        """Create new symbol class instance."""
-        return Symbol(self.config, symbol_name)
+        """Create new symbol class instance, cloned from the symbol prototype."""
+        return self.get_symbol(symbol_name).clone()
 
     def get_symbol(self, name: str) -> object:
-        """Retrieve symbol class from name."""
+        """Retrieve symbol prototype from name."""
         if name not in self.symbols:
             self.symbols[name] = Symbol(self.config, name)
         return self.symbols[name]
 
 
+ATTRIBUTE_BITS: Dict[str, int] = {}
+
+
+def get_attribute_bit(attribute: str) -> int:
+    """Bit used for an attribute name in Symbol.flags, allocated on first use."""
+    if attribute not in ATTRIBUTE_BITS:
+        ATTRIBUTE_BITS[attribute] = 1 << len(ATTRIBUTE_BITS)
+    return ATTRIBUTE_BITS[attribute]
+
+
 class Symbol:
-    """Create symbol from name (string) and assign relevant attributes and special functions."""
+    """Create symbol from name (string) and assign relevant attributes and special functions.
+
+    Special properties from the config and assigned attributes are not stored as instance attributes.
+    `flags` has a bit (see get_attribute_bit) set for every attribute check_attribute() is True for,
+    `properties` lists the special properties of the symbol name and `values` holds assigned
+    attribute values (multiplier, prize, explode, ...) in assignment order, or None if there are none.
+    Attributes can still be read and assigned as regular attributes, e.g. `symbol.multiplier`.
+    """
+
+    __slots__ = ("name", "special_functions", "special", "is_paying", "paytable", "properties", "flags", "values")
 
     def __init__(self, config: object, name: str) -> None:
-        self.name = name
-        self.special_functions = []
+        self.name = sys.intern(name)
+        self.special_functions = ()
         self.special = False
-        is_special = False
+        self.flags = 0
+        self.values = None
+        properties = []
         for special_property in config.special_symbols.keys():
             if name in config.special_symbols[special_property]:
-                setattr(self, special_property, True)
-                is_special = True
+                properties.append(special_property)
+                self.flags |= get_attribute_bit(special_property)
 
-        if is_special:
-            setattr(self, "special", True)
+        self.properties = tuple(properties)
+        if len(properties) > 0:
+            self.special = True
 
         self.assign_paying_bool(config)
 
+    def clone(self) -> object:
+        """Copy of this symbol, sharing the (read-only) paytable. Attributes assigned to the copy do not affect the original."""
+        symbol = Symbol.__new__(Symbol)
+        set_slot = object.__setattr__
+        set_slot(symbol, "name", self.name)
+        set_slot(symbol, "special_functions", self.special_functions)
+        set_slot(symbol, "special", self.special)
+        set_slot(symbol, "is_paying", self.is_paying)
+        set_slot(symbol, "paytable", self.paytable)
+        set_slot(symbol, "properties", self.properties)
+        set_slot(symbol, "flags", self.flags)
+        set_slot(symbol, "values", None if self.values is None else dict(self.values))
+        return symbol
+
+    def __getstate__(self) -> dict:
+        """Slot values for pickling and copying. Attribute bits are allocated per process (see get_attribute_bit),
+        so flags are stored as attribute names and rebuilt by __setstate__ in the receiving process."""
+        state = {slot: object.__getattribute__(self, slot) for slot in Symbol.__slots__}
+        state["flags"] = tuple(attribute for attribute, bit in ATTRIBUTE_BITS.items() if self.flags & bit)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        flags = 0
+        for attribute in state["flags"]:
+            flags |= get_attribute_bit(attribute)
+        for slot in Symbol.__slots__:
+            object.__setattr__(self, slot, state[slot])
+        # Strings are not interned when unpickled, e.g. in spawned worker processes
+        object.__setattr__(self, "name", sys.intern(state["name"]))
+        object.__setattr__(self, "flags", flags)
+
     def register_special_function(self, special_function: callable) -> None:
         """Assign special symbol function."""
-        self.special_functions.append(special_function)
+        self.special_functions = self.special_functions + (special_function,)
 
     def apply_special_function(self) -> callable:
         """Apply registered symbol function."""
@@ -71,20 +129,51 @@ class Symbol:
         return self.special
 
     def check_attribute(self, *args) -> bool:
-        """Check if an attribute exists in a given list."""
+        """Check if an attribute exists in a given list (and is not False)."""
         for arg in args:
-            if hasattr(self, arg) and (not (isinstance(getattr(self, arg), bool)) or getattr(self, arg) is True):
+            if self.flags & ATTRIBUTE_BITS.get(arg, 0):
                 return True
         return False
 
     def get_attribute(self, attribute) -> type:
         """Return existing attribute value."""
-        return getattr(self, attribute)
+        if self.values is not None and attribute in self.values:
+            return self.values[attribute]
+        if attribute in self.properties:
+            return True
+        if attribute in Symbol.__slots__:
+            return object.__getattribute__(self, attribute)
+        raise AttributeError(f"Symbol '{self.name}' has no attribute '{attribute}'")
+
+    def get_attributes(self) -> dict:
+        """All special properties and assigned attributes, special properties first."""
+        attributes = {prop: True for prop in self.properties}
+        if self.values is not None:
+            attributes.update(self.values)
+        return attributes
 
     def assign_attribute(self, attribute_dict: dict) -> None:
         """Assign attribute value to symbol."""
         for prop, value in attribute_dict.items():
-            setattr(self, prop, value)
+            if prop in Symbol.__slots__:
+                object.__setattr__(self, prop, value)
+                continue
+            if self.values is None:
+                self.values = {}
+            self.values[prop] = value
+            if value is False:
+                self.flags &= ~get_attribute_bit(prop)
+            else:
+                self.flags |= get_attribute_bit(prop)
+
+    def __getattr__(self, attribute: str):
+        # Only called when attribute is not a slot, i.e. for special properties and assigned attributes.
+        if attribute.startswith("__") or attribute in Symbol.__slots__:
+            raise AttributeError(attribute)
+        return self.get_attribute(attribute)
+
+    def __setattr__(self, attribute: str, value) -> None:
+        self.assign_attribute({attribute: value})
 
     def __eq__(self, name: str) -> bool:
         if self.name == name:
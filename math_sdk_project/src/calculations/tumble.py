@@ -7,45 +7,55 @@ class Tumble(Board):
     """General class for cascading/tumble game actions."""
 
     def tumble_board(self) -> None:
-        """Remove winning symbols from the active gameboard."""
+        """
+        Remove winning symbols from the active gameboard.
+
+        Each reel is compacted in a single pass: remaining symbols drop down and the refill is read as
+        a slice of the reelstrip above the current stop position. With padding, the previous top
+        padding symbol is the lowest refill. Refills are created from the bottom up, so symbol
+        attributes are drawn in reelstrip order. Special symbol positions are only updated on reels
+        which tumbled.
+        """
         self.board_before_tumble = copy(self.board)
-        static_board = copy(self.board)
-        self.new_symbols_from_tumble = [[] for _ in range(len(static_board))]
-
-        for reel, _ in enumerate(static_board):
-            exploding_symbols = 0
-            copy_reel = static_board[reel]
-            exploding_symbols = sum(1 for x in static_board[reel] if x.check_attribute("explode"))
-
-            for i in range(exploding_symbols):
-                reel_pos = (self.reel_positions[reel] - 1) % len(self.reelstrip[reel])
-                self.reel_positions[reel] = reel_pos
-                # Take top symbol if it exists (don't add this to new_symbols_from_tumble)
-                if i == 0 and self.config.include_padding:
-                    insert_sym = self.top_symbols[reel]
-                else:
-                    nme = self.reelstrip[reel][(reel_pos) % len(self.reelstrip[reel])]
-                    insert_sym = self.create_symbol(nme)
-                    self.new_symbols_from_tumble[reel].insert(0, insert_sym)
-                copy_reel.insert(0, insert_sym)
+        self.new_symbols_from_tumble = [[] for _ in range(len(self.board))]
+        board = copy(self.board)
+        tumbled_reels = []
+
+        for reel, symbols in enumerate(self.board):
+            remaining = [sym for sym in symbols if not sym.check_attribute("explode")]
+            num_exploding = len(symbols) - len(remaining)
+            if num_exploding == 0:
+                continue
 
-            copy_reel = [sym for sym in copy_reel if not (sym.check_attribute("explode"))]
+            strip = self.reelstrip[reel]
+            stop = (self.reel_positions[reel] - num_exploding) % len(strip)
+            self.reel_positions[reel] = stop
+            if stop + num_exploding <= len(strip):
+                refill_names = strip[stop : stop + num_exploding]
+            else:
+                refill_names = strip[stop:] + strip[: stop + num_exploding - len(strip)]
 
-            if len(copy_reel) != self.config.num_rows[reel]:
+            refill = [None] * num_exploding
+            for idx in reversed(range(num_exploding)):
+                if idx == num_exploding - 1 and self.config.include_padding:
+                    refill[idx] = self.top_symbols[reel]
+                else:
+                    refill[idx] = self.create_symbol(refill_names[idx])
+            self.new_symbols_from_tumble[reel] = refill[:-1] if self.config.include_padding else list(refill)
+
+            board[reel] = refill + remaining
+            if len(board[reel]) != self.config.num_rows[reel]:
                 raise RuntimeError(
-                    f"new reel length must match expected board size:\n expected: {self.config.num_rows[reel]} \n actual: {len(copy_reel)}"
+                    f"new reel length must match expected board size:\n expected: {self.config.num_rows[reel]} \n actual: {len(board[reel])}"
                 )
-            static_board[reel] = copy_reel
 
-            if self.config.include_padding and exploding_symbols > 0:
-                padding_name = str(
-                    self.reelstrip[reel][(self.reel_positions[reel] - 1) % len(self.reelstrip[reel])]
-                )
-                self.top_symbols[reel] = self.create_symbol(padding_name)
+            if self.config.include_padding:
+                self.top_symbols[reel] = self.create_symbol(strip[(stop - 1) % len(strip)])
                 self.new_symbols_from_tumble[reel].insert(0, self.top_symbols[reel])
+            tumbled_reels.append(reel)
 
-        self.board = static_board
-        self.get_special_symbols_on_board()
+        self.board = board
+        self.update_special_symbols_on_reels(tumbled_reels)
 
     def set_end_tumble_event(self) -> None:
         """Emit wins related to latest cumulative tumble sequence."""
@@ -1,8 +1,11 @@
 """Ways wins executables/calculations."""
 
 from collections import defaultdict
+from typing import NamedTuple
+import numpy as np
 from src.calculations.symbol import Symbol
 from src.config.config import Config
+from src.config.compiled_model import get_compiled_model
 from src.wins.multiplier_strategy import apply_mult
 from src.events.events import (
     win_info_event,
@@ -11,6 +14,17 @@ from src.events.events import (
 )
 
 
+class WaysBatchWins(NamedTuple):
+    """Ways results for a batch of boards, arrays indexed by [board, symbol_id]. Only symbols on the
+    first reel can win; first_rows holds the row of their first appearance (num_rows otherwise)."""
+
+    kinds: np.ndarray
+    ways: np.ndarray
+    symbol_mults: np.ndarray
+    board_mults: np.ndarray
+    first_rows: np.ndarray
+
+
 class Ways:
     """Collection of Ways-wins functions"""
 
@@ -141,6 +155,131 @@ class Ways:
 
         return return_data
 
+    @staticmethod
+    def get_ways_batch(
+        boards: np.ndarray,
+        config: Config,
+        multipliers: np.ndarray = None,
+        has_multiplier: np.ndarray = None,
+        wild_key: str = "wild",
+        multiplier_strategy: str = "symbol",
+    ) -> WaysBatchWins:
+        """
+        Evaluate ways for every symbol of an (N, reels, rows) array of compiled symbol ids at once.
+        Cells beyond a reel's number of rows are padded with -1. `multipliers` holds multiplier
+        attribute values and `has_multiplier` which cells have the attribute (default: non-zero values).
+
+        A [symbol, reel] count matrix and per-reel wild counts give ways and kinds for all symbols.
+        Cell counts, wild multipliers (symbolMult) and the per-symbol additions to the board
+        multiplier follow get_ways_data for the "symbol", "board" and "global" strategies.
+        """
+        assert multiplier_strategy in ["symbol", "board", "global"]
+        model = get_compiled_model(config)
+        boards = np.asarray(boards)
+        num_rows = boards.shape[2]
+        if multipliers is None:
+            multipliers = np.zeros(boards.shape, dtype=np.int64)
+        multipliers = np.asarray(multipliers)
+        if has_multiplier is None:
+            has_multiplier = multipliers != 0
+
+        wild_ids = [model.symbol_ids[name] for name in config.special_symbols[wild_key]]
+        is_wild = np.isin(boards, wild_ids)
+        cell_counts = np.where(has_multiplier & (multiplier_strategy == "symbol"), multipliers, 1)
+        mult_bonus = np.where(has_multiplier & (multipliers > 1), multipliers, 0)
+        if multiplier_strategy == "global":
+            wild_bonus = np.zeros(is_wild.shape[:2], dtype=mult_bonus.dtype)
+        else:
+            wild_bonus = (mult_bonus * is_wild).sum(axis=2)
+
+        symbol_cells = boards[..., None] == np.arange(len(model.symbol_names))
+        symbol_counts = (symbol_cells * cell_counts[..., None]).sum(axis=2)
+        reel_ways = symbol_counts + (cell_counts * is_wild).sum(axis=2)[..., None]
+        active = symbol_cells.any(axis=2) | is_wild.any(axis=2)[..., None]
+        in_kind = np.cumprod(active, axis=1).astype(bool)
+
+        if multiplier_strategy == "board":
+            reel_mults = (symbol_cells * mult_bonus[..., None]).sum(axis=2) + wild_bonus[..., None]
+            board_mults = (reel_mults * in_kind).sum(axis=1)
+        else:
+            board_mults = np.zeros((in_kind.shape[0], in_kind.shape[2]), dtype=mult_bonus.dtype)
+
+        first_reel = symbol_cells[:, 0]
+        return WaysBatchWins(
+            kinds=in_kind.sum(axis=1),
+            ways=np.where(in_kind, reel_ways, 1).prod(axis=1),
+            symbol_mults=(wild_bonus[..., None] * in_kind).sum(axis=1),
+            board_mults=board_mults,
+            first_rows=np.where(first_reel.any(axis=1), first_reel.argmax(axis=1), num_rows),
+        )
+
+    @staticmethod
+    def get_batch_ways_data(
+        batch: WaysBatchWins,
+        board_index: int,
+        board: list[list[Symbol]],
+        config: Config,
+        wild_key: str = "wild",
+        global_multiplier: int = 1,
+        multiplier_key: str = "multiplier",
+        multiplier_strategy: str = "symbol",
+    ) -> dict:
+        """get_ways_data output for one board of a batch, building win details only for paying symbols."""
+        return_data = {
+            "totalWin": 0,
+            "wins": [],
+        }
+        model = get_compiled_model(config)
+        first_rows = batch.first_rows[board_index]
+        board_mult_count = 0
+        for sym_id in sorted(np.flatnonzero(first_rows < len(board[0])), key=lambda s: first_rows[s]):
+            symbol = model.symbol_names[sym_id]
+            kind = int(batch.kinds[board_index, sym_id])
+            ways = batch.ways[board_index, sym_id].item()
+            board_mult_count += batch.board_mults[board_index, sym_id].item()
+            match multiplier_strategy:
+                case "global":
+                    win_multiplier = global_multiplier
+                case "board":
+                    win_multiplier = max(board_mult_count, 1)
+                case "symbol":
+                    win_multiplier = 1
+
+            if (kind, symbol) in config.paytable:
+                positions = []
+                for reel in range(kind):
+                    positions += [{"reel": reel, "row": row} for row, sym in enumerate(board[reel]) if sym.name == symbol]
+                    for row, sym in enumerate(board[reel]):
+                        if sym.name in config.special_symbols[wild_key]:
+                            positions.append({"reel": reel, "row": row})
+                            if sym.check_attribute(multiplier_key):
+                                positions[-1][multiplier_key] = sym.get_attribute(multiplier_key)
+
+                win = round(config.paytable[kind, symbol] * ways, 2)
+                win_amt, multiplier = apply_mult(
+                    board=board,
+                    strategy="global",
+                    win_amount=win,
+                    global_multiplier=win_multiplier,
+                )
+                return_data["wins"] += [
+                    {
+                        "symbol": symbol,
+                        "kind": kind,
+                        "win": win_amt,
+                        "positions": positions,
+                        "meta": {
+                            "ways": ways,
+                            "globalMult": multiplier,
+                            "winWithoutMult": win,
+                            "symbolMult": batch.symbol_mults[board_index, sym_id].item(),
+                        },
+                    }
+                ]
+                return_data["totalWin"] += win_amt
+
+        return return_data
+
     @staticmethod
     def emit_wayswin_events(gamestate) -> None:
         """Transmit win events asociated with ways wins."""
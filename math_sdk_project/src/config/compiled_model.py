@@ -0,0 +1,249 @@
+"""Compile game configuration into integer arrays used by fast board generation and win evaluation."""
+
+import sys
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+import numpy as np
+
+REEL_COLUMN_CACHE_SIZE = 4096
+
+
+class ReelWindow(NamedTuple):
+    """Symbols visible on a reel for a single stop position (the top row of the board)."""
+
+    symbols: Tuple[str, ...]
+    symbol_ids: Tuple[int, ...]
+    top: str
+    bottom: str
+    special_rows: Tuple[int, ...]
+    special_mask: int
+    special_counts: Tuple[int, ...]
+    padding_position: int
+
+
+class PaylineNode(NamedTuple):
+    """Board position shared by all paylines with the same rows up to this reel."""
+
+    reel: int
+    row: int
+    children: List["PaylineNode"]
+    lines: List[object]
+
+
+class ReelColumn(NamedTuple):
+    """Client (JSON-ready) symbols of a reel window, padding symbols included if requested."""
+
+    symbols: Tuple[str, ...]
+    json_symbols: Tuple[dict, ...]
+
+
+class CompiledGameModel:
+    """
+    Integer representation of a game configuration.
+
+    Symbols are numbered by sorted name, so the same config always compiles to the same ids.
+    Reelstrips become arrays of symbol ids, the paytable a [symbol_id, kind] array of payouts and
+    special symbol types a bit per type, combined per symbol in `symbol_flags`.
+    """
+
+    def __init__(self, config: object):
+        self.num_reels = config.num_reels
+        self.num_rows = list(config.num_rows)
+        self.compile_symbols(config)
+        self.compile_paytable(config)
+        self.compile_reels(config)
+        self.compile_paylines(config)
+        self.compile_payline_trie()
+        self.compile_reel_windows()
+        self.stops_by_count: Dict[Tuple[str, str], List[Dict[int, List[int]]]] = {}
+        self.reel_columns: "OrderedDict[Tuple[str, int, int, bool], ReelColumn]" = OrderedDict()
+
+    def compile_symbols(self, config: object) -> None:
+        """Symbol name to integer mapping and special symbol bitmasks."""
+        all_symbols = {name for (_, name) in config.paytable}
+        for special_type in config.special_symbols:
+            all_symbols.update(config.special_symbols[special_type])
+        for strips in getattr(config, "reels", {}).values():
+            for strip in strips:
+                all_symbols.update(strip)
+
+        self.symbol_names: List[str] = sorted(sys.intern(name) for name in all_symbols)
+        self.symbol_ids: Dict[str, int] = {name: idx for idx, name in enumerate(self.symbol_names)}
+        self.symbol_dtype = np.int8 if len(self.symbol_names) <= np.iinfo(np.int8).max else np.int16
+
+        self.special_types = list(config.special_symbols)
+        self.special_bits: Dict[str, int] = {}
+        self.symbol_flags = np.zeros(len(self.symbol_names), dtype=np.uint32)
+        for bit, special_type in enumerate(config.special_symbols):
+            self.special_bits[special_type] = 1 << bit
+            for name in config.special_symbols[special_type]:
+                self.symbol_flags[self.symbol_ids[name]] |= 1 << bit
+
+        # JSON-ready symbol without assigned attributes, as given by events.json_ready_sym
+        self.symbol_json: List[dict] = [
+            dict(
+                [("name", name)]
+                + [(t, True) for t in self.special_types if name in config.special_symbols[t]]
+            )
+            for name in self.symbol_names
+        ]
+
+    def compile_paytable(self, config: object) -> None:
+        """Payout array indexed by [symbol_id, kind], zero where there is no pay."""
+        self.max_kind = max((kind for (kind, _) in config.paytable), default=0)
+        self.pay_array = np.zeros((len(self.symbol_names), self.max_kind + 1), dtype=np.float64)
+        for (kind, name), pay in config.paytable.items():
+            self.pay_array[self.symbol_ids[name], kind] = pay
+        self.is_paying = self.pay_array.any(axis=1)
+
+    def compile_reels(self, config: object) -> None:
+        """Each reelstrip as a list of symbol id arrays, one per reel."""
+        self.reel_ids: Dict[str, List[np.ndarray]] = {}
+        for reelstrip_id, strips in getattr(config, "reels", {}).items():
+            self.reel_ids[reelstrip_id] = [
+                np.array([self.symbol_ids[name] for name in strip], dtype=self.symbol_dtype) for strip in strips
+            ]
+
+    def compile_paylines(self, config: object) -> None:
+        """Payline row indices as a [line, reel] array, in the order of config.paylines."""
+        paylines = getattr(config, "paylines", {})
+        self.payline_ids = list(paylines.keys())
+        self.paylines = np.array([paylines[line] for line in self.payline_ids], dtype=np.int16).reshape(
+            len(self.payline_ids), self.num_reels
+        )
+
+    def compile_payline_trie(self) -> None:
+        """Prefix trie of the paylines, one level per reel. Each node lists every line passing
+        through it, in config.paylines order."""
+        self.payline_trie: List[PaylineNode] = []
+        for line_index, line in zip(self.payline_ids, self.paylines.tolist()):
+            nodes = self.payline_trie
+            for reel, row in enumerate(line):
+                node = next((n for n in nodes if n.row == row), None)
+                if node is None:
+                    node = PaylineNode(reel, row, [], [])
+                    nodes.append(node)
+                node.lines.append(line_index)
+                nodes = node.children
+
+    def compile_reel_windows(self) -> None:
+        """Visible window of every stop position on every reel, with padding and special symbol details.
+        special_counts follow the order of special_types. Windows wrap around the end of the reelstrip."""
+        self.reel_windows: Dict[str, List[List[ReelWindow]]] = {}
+        type_masks = [self.special_bits[special_type] for special_type in self.special_types]
+        for reelstrip_id, strips in self.reel_ids.items():
+            self.reel_windows[reelstrip_id] = []
+            for reel, strip in enumerate(strips):
+                if reel >= self.num_reels:
+                    break
+                strip = strip.tolist()
+                strip_len, num_rows = len(strip), self.num_rows[reel]
+                windows = []
+                for stop in range(strip_len):
+                    ids = tuple(strip[(stop + row) % strip_len] for row in range(num_rows))
+                    flags = [int(self.symbol_flags[sym_id]) for sym_id in ids]
+                    special_mask = 0
+                    for f in flags:
+                        special_mask |= f
+                    windows.append(
+                        ReelWindow(
+                            symbols=tuple(self.symbol_names[sym_id] for sym_id in ids),
+                            symbol_ids=ids,
+                            top=self.symbol_names[strip[(stop - 1) % strip_len]],
+                            bottom=self.symbol_names[strip[(stop + num_rows) % strip_len]],
+                            special_rows=tuple(row for row, f in enumerate(flags) if f),
+                            special_mask=special_mask,
+                            special_counts=tuple(sum(1 for f in flags if f & mask) for mask in type_masks),
+                            padding_position=(stop + num_rows + 1) % strip_len,
+                        )
+                    )
+                self.reel_windows[reelstrip_id].append(windows)
+
+    def get_reel_window(self, reelstrip_id: str, reel: int, stop: int) -> ReelWindow:
+        """Window for any (possibly negative) stop position."""
+        windows = self.reel_windows[reelstrip_id][reel]
+        return windows[stop % len(windows)]
+
+    def get_reel_column(self, reelstrip_id: str, reel: int, stop: int, include_padding: bool) -> ReelColumn:
+        """
+        Client symbols of a reel window, with the top and bottom padding symbols if include_padding.
+        The most recently used REEL_COLUMN_CACHE_SIZE columns are kept. The returned dicts are shared,
+        so must be copied before being modified or placed in an event.
+        """
+        key = (reelstrip_id, reel, stop, include_padding)
+        column = self.reel_columns.get(key)
+        if column is not None:
+            self.reel_columns.move_to_end(key)
+            return column
+
+        window = self.get_reel_window(reelstrip_id, reel, stop)
+        symbols = window.symbols
+        if include_padding:
+            symbols = (window.top,) + symbols + (window.bottom,)
+        column = ReelColumn(symbols, tuple(self.symbol_json[self.symbol_ids[name]] for name in symbols))
+        self.reel_columns[key] = column
+        if len(self.reel_columns) > REEL_COLUMN_CACHE_SIZE:
+            self.reel_columns.popitem(last=False)
+        return column
+
+    def get_stops_by_count(self, reelstrip_id: str, target: str) -> List[Dict[int, List[int]]]:
+        """
+        Stop positions of each reel grouped by how many target symbols their window shows.
+        The target is a special symbol type or a symbol name (compared case-insensitively).
+        Built on first use for each (reelstrip_id, target) pair.
+        """
+        key = (reelstrip_id, target)
+        if key not in self.stops_by_count:
+            if target in self.special_bits:
+                type_index = self.special_types.index(target)
+                count_target = lambda window: window.special_counts[type_index]
+            else:
+                count_target = lambda window: sum(1 for name in window.symbols if name.upper() == target.upper())
+            stops_by_count = []
+            for windows in self.reel_windows[reelstrip_id]:
+                reel_stops = {}
+                for stop, window in enumerate(windows):
+                    reel_stops.setdefault(count_target(window), []).append(stop)
+                stops_by_count.append(dict(sorted(reel_stops.items())))
+            self.stops_by_count[key] = stops_by_count
+        return self.stops_by_count[key]
+
+    def sample_boards(self, reelstrip_id: str, num_boards: int, rng: np.random.Generator) -> np.ndarray:
+        """(num_boards, reels, rows) symbol ids for uniformly drawn stop positions. All reels need the same number of rows."""
+        if len(set(self.num_rows)) != 1:
+            raise ValueError("Board batches require the same number of rows on every reel.")
+        num_rows = self.num_rows[0]
+        boards = np.empty((num_boards, self.num_reels, num_rows), dtype=self.symbol_dtype)
+        for reel in range(self.num_reels):
+            strip = self.reel_ids[reelstrip_id][reel]
+            stops = rng.integers(0, len(strip), num_boards)
+            boards[:, reel, :] = strip[(stops[:, None] + np.arange(num_rows)) % len(strip)]
+        return boards
+
+    def get_special_mask(self, *special_types: str) -> int:
+        """Combined bitmask of one or more special symbol types."""
+        mask = 0
+        for special_type in special_types:
+            mask |= self.special_bits.get(special_type, 0)
+        return mask
+
+    def get_symbol_mask(self, *special_types: str) -> np.ndarray:
+        """Boolean array over symbol ids, True for symbols having any of the special types."""
+        return (self.symbol_flags & self.get_special_mask(*special_types)) != 0
+
+    def encode_board(self, board: List[List[object]]) -> List[np.ndarray]:
+        """Symbol ids of a board of Symbol objects (or names), reel by reel."""
+        return [
+            np.array([self.symbol_ids[getattr(sym, "name", sym)] for sym in reel], dtype=self.symbol_dtype)
+            for reel in board
+        ]
+
+
+_compiled_models = {}
+
+
+def get_compiled_model(config: object) -> CompiledGameModel:
+    """Compiled model for a config, built once per process and reused afterwards."""
+    if id(config) not in _compiled_models:
+        _compiled_models[id(config)] = (config, CompiledGameModel(config))
+    return _compiled_models[id(config)][1]
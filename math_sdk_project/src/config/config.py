@@ -3,6 +3,7 @@
 from src.config.betmode import BetMode
 from src.config.paths import PATH_TO_GAMES
 import os
+import sys
 
 
 class Config:
@@ -49,6 +50,9 @@ class Config:
         self.padding_reels = {}  # symbol configuration displayed before the board reveal
 
         self.write_event_list = True
+        # if True, cached distribution samplers return the same outcomes as a linear search of the weights.
+        # If False, O(1) alias tables are used, which changes the simulation results for a given seed.
+        self.exact_rng_sampling = True
 
         self.bet_modes = []
         self.opt_params = {None: None}
@@ -120,7 +124,7 @@ class Config:
             )
 
     def read_reels_csv(self, file_path):
-        """Read csv from reelstrip path."""
+        """Read csv from reelstrip path. Symbol names are interned, so that every occurrence of a name is the same string."""
         reelstrips = []
         count = 0
         with open(os.path.abspath(file_path), "r", encoding="UTF-8") as file:
@@ -128,10 +132,14 @@ class Config:
                 split_line = line.strip().split(",")
                 for reelIndex in range(len(split_line)):
                     if count == 0:
-                        reelstrips.append(["".join([ch for ch in split_line[reelIndex] if ch.strip().isalnum()])])
+                        reelstrips.append(
+                            [sys.intern("".join([ch for ch in split_line[reelIndex] if ch.strip().isalnum()]))]
+                        )
                     else:
                         reelstrips[reelIndex].append(
-                            "".join([ch for ch in split_line[reelIndex] if ch.strip().isalnum() and len(ch) > 0])
+                            sys.intern(
+                                "".join([ch for ch in split_line[reelIndex] if ch.strip().isalnum() and len(ch) > 0])
+                            )
                         )
 
                     assert len(reelstrips[reelIndex][-1]) > 0, "Symbol is empty."
@@ -23,7 +23,6 @@ class OutputFiles:
     def setup_output_directories(self):
         """Entrypoint for saving all output files."""
         self.library_path = os.path.join(PATH_TO_GAMES, str(self.game_config.game_id), "library")
-        self.temp_path = os.path.join(self.library_path, "temp_multi_threaded_files")
         self.config_path = os.path.join(self.library_path, "configs")
         self.force_path = os.path.join(self.library_path, "forces")
         self.book_path = os.path.join(self.library_path, "books")
@@ -42,7 +41,6 @@ class OutputFiles:
             "lookup_path",
             "config_path",
             "force_path",
-            "temp_path",
             "optimization_path",
             "optimization_result_path",
             "publish_path",
@@ -119,31 +117,6 @@ class OutputFiles:
                 },
             }
 
-    def get_temp_multi_thread_name(self, betmode: str, thread_index: int, repeat_count: int, compress: bool):
-        """Naming convention for temp book files."""
-        if compress:
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.jsonl.zst"
-        elif not (compress) and self.game_config.output_regular_json:
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.json"
-        elif not (compress) and not (self.game_config.output_regular_json):
-            filename = f"books_{betmode}_{thread_index}_{repeat_count}.jsonl"
-        else:
-            raise RuntimeError("Error in logic generating book name")
-
-        return os.path.join(self.temp_path, filename)
-
-    def get_temp_lookup_name(self, betmode: str, thread_index: int, repeat_count: int):
-        """Naming convention for temp lookup files."""
-        return os.path.join(self.temp_path, f"lookUpTable_{betmode}_{thread_index}_{repeat_count}")
-
-    def get_temp_segmented_name(self, betmode: str, thread_index: int, repeat_count: int):
-        """Naming convention for temp segmented lookup files."""
-        return os.path.join(self.temp_path, f"lookUpTableSegmented_{betmode}_{thread_index}_{repeat_count}")
-
-    def get_temp_force_name(self, betmode: str, thread_index: int, repeat_count: int):
-        """Naming convention for temp force files."""
-        return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
-
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
         if compress:
@@ -156,6 +129,27 @@ class OutputFiles:
             raise RuntimeError("Logic error in name generation.")
         return os.path.join(self.compressed_path if compress else self.book_path, filename)
 
+    def get_binary_book_name(self, betmode: str, compress: bool):
+        """Intermediate binary books, transcoded into the final books when publishing."""
+        filename = f"books_{betmode}.bin.zst" if compress else f"books_{betmode}.bin"
+        return os.path.join(self.book_path, filename)
+
+    def get_book_index_name(self, betmode: str):
+        """Binary book id index of a seekable compressed books archive."""
+        return os.path.join(self.book_path, f"books_{betmode}.index")
+
+    def get_book_dictionary_name(self, betmode: str):
+        """Zstd dictionary used to compress the frames of the dictionary books archive."""
+        return os.path.join(self.book_path, f"books_{betmode}.dict")
+
+    def get_dictionary_archive_name(self, betmode: str):
+        """Seekable books archive compressed with a trained dictionary, never published."""
+        return os.path.join(self.book_path, f"books_{betmode}.archive.zst")
+
+    def get_dictionary_archive_index_name(self, betmode: str):
+        """Binary book id index of the dictionary books archive."""
+        return os.path.join(self.book_path, f"books_{betmode}.archive.index")
+
     def get_final_lookup_name(self, betmode: str):
         """Final csv lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTable_{betmode}.csv")
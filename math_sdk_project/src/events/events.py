@@ -1,47 +1,78 @@
 """Defines reusable events"""
 
 from copy import deepcopy
+from functools import wraps
+from src.config.compiled_model import get_compiled_model
 from src.events.event_constants import EventConstants
 
 
+def book_event(event_function):
+    """
+    Skip constructing an event entirely if the book does not record events (stats-only runs).
+    Wrapped event functions must only build and add their event, without changing the gamestate.
+    """
+
+    @wraps(event_function)
+    def emit_event(gamestate, *args, **kwargs):
+        if gamestate.book.record_events:
+            return event_function(gamestate, *args, **kwargs)
+
+    return emit_event
+
+
 def json_ready_sym(symbol: object, special_attributes: list = None):
     """Converts a symbol to dictionary/JSON format."""
     assert special_attributes is not None
     print_sym = {"name": symbol.name}
-    attrs = vars(symbol)
+    attrs = symbol.get_attributes()
     for key, val in attrs.items():
-        if key in special_attributes and symbol.get_attribute(key) != False:
+        if key in special_attributes and val != False:
             print_sym[key] = val
     return print_sym
 
 
+@book_event
 def reveal_event(gamestate):
-    """Display the initial board drawn from reelstrips."""
+    """Display the initial board drawn from reelstrips.
+
+    Reels are read from the cached client columns of their stop positions, only symbols which were
+    replaced or have assigned attributes (multipliers, prizes, ...) are converted individually.
+    """
     board_client = []
     special_attributes = list(gamestate.config.special_symbols.keys())
+    include_padding = gamestate.config.include_padding
+    model = get_compiled_model(gamestate.config)
     for reel, _ in enumerate(gamestate.board):
-        board_client.append([])
-        for row in range(len(gamestate.board[reel])):
-            board_client[reel].append(json_ready_sym(gamestate.board[reel][row], special_attributes))
-
-    if gamestate.config.include_padding:
-        for reel, _ in enumerate(board_client):
-            board_client[reel] = [json_ready_sym(gamestate.top_symbols[reel], special_attributes)] + board_client[
-                reel
+        reel_symbols = gamestate.board[reel]
+        if include_padding:
+            reel_symbols = [gamestate.top_symbols[reel]] + reel_symbols + [gamestate.bottom_symbols[reel]]
+        column = model.get_reel_column(gamestate.reelstrip_id, reel, gamestate.reel_positions[reel], include_padding)
+        if len(column.symbols) != len(reel_symbols):
+            board_client.append([json_ready_sym(sym, special_attributes) for sym in reel_symbols])
+            continue
+        board_client.append(
+            [
+                (
+                    dict(column.json_symbols[row])
+                    if sym.values is None and sym.name == column.symbols[row]
+                    else json_ready_sym(sym, special_attributes)
+                )
+                for row, sym in enumerate(reel_symbols)
             ]
-            board_client[reel].append(json_ready_sym(gamestate.bottom_symbols[reel], special_attributes))
+        )
 
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.REVEAL.value,
         "board": board_client,
-        "paddingPositions": gamestate.reel_positions,
+        "paddingPositions": list(gamestate.reel_positions),
         "gameType": gamestate.gametype,
-        "anticipation": gamestate.anticipation,
+        "anticipation": list(gamestate.anticipation),
     }
     gamestate.book.add_event(event)
 
 
+@book_event
 def fs_trigger_event(
     gamestate,
     include_padding_index=True,
@@ -51,9 +82,7 @@ def fs_trigger_event(
     """Triggers feature game from the basegame."""
     assert basegame_trigger != freegame_trigger, "must set either basegame_trigger or freeSpinTrigger to = True"
     event = {}
-    scatter_positions = []
-    for reel, _ in enumerate(gamestate.special_syms_on_board["scatter"]):
-        scatter_positions.append(gamestate.special_syms_on_board["scatter"][reel])
+    scatter_positions = [dict(pos) for pos in gamestate.special_syms_on_board["scatter"]]
     if include_padding_index:
         for pos in scatter_positions:
             pos["row"] += 1
@@ -77,6 +106,7 @@ def fs_trigger_event(
     gamestate.book.add_event(event)
 
 
+@book_event
 def set_win_event(gamestate, winlevel_key: str = "standard"):
     """Used for updating cumulative win ticker (for a single outcome)."""
     if not gamestate.wincap_triggered:
@@ -94,6 +124,7 @@ def set_win_event(gamestate, winlevel_key: str = "standard"):
         gamestate.book.add_event(event)
 
 
+@book_event
 def set_total_event(gamestate):
     """Updates win amount for a betting round (including cumulative wins across multiple freespin wins)."""
     event = {
@@ -109,6 +140,7 @@ def set_total_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def set_tumble_event(gamestate):
     """Update banner indicating wins from successive tumbles."""
     event = {
@@ -119,6 +151,7 @@ def set_tumble_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def wincap_event(gamestate):
     """Emit to indicate end of spin actions."""
     event = {
@@ -134,6 +167,7 @@ def wincap_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def win_info_event(gamestate, include_padding_index=True):
     """
     include_padding_index: starts winning-symbol positions at row=1, to account for top/bottom symbol inclusion in board
@@ -173,6 +207,7 @@ def win_info_event(gamestate, include_padding_index=True):
     gamestate.book.add_event(event)
 
 
+@book_event
 def update_tumble_win_event(gamestate):
     """Update a banner to record successive tumble wins."""
     event = {
@@ -183,6 +218,7 @@ def update_tumble_win_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def update_freespin_event(gamestate):
     """Update the current spin number and total freegame"""
     event = {
@@ -194,6 +230,7 @@ def update_freespin_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def freespin_end_event(gamestate, winlevel_key="endFeature"):
     """End of feature trigger."""
     event = {
@@ -205,6 +242,7 @@ def freespin_end_event(gamestate, winlevel_key="endFeature"):
     gamestate.book.add_event(event)
 
 
+@book_event
 def final_win_event(gamestate):
     """Assigns final payout multiplier for a simulation."""
     event = {
@@ -215,6 +253,7 @@ def final_win_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def update_global_mult_event(gamestate):
     """Increment global multiplier value."""
     event = {
@@ -226,6 +265,7 @@ def update_global_mult_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def tumble_board_event(gamestate):
     """States the symbol positions removed from a board during tumble, and which new symbols should take their place."""
     special_attributes = list(gamestate.config.special_symbols.keys())
@@ -254,6 +294,7 @@ def tumble_board_event(gamestate):
     gamestate.book.add_event(event)
 
 
+@book_event
 def enter_bonus_event(gamestate) -> None:
     "Indicate feature game entry explicitly."
     event = {
@@ -50,8 +50,8 @@ class Executables(Conditions, Tumble):
 
     def check_freespin_entry(self, scatter_key: str = "scatter") -> bool:
         """Ensure that betmode criteria is expecting freespin trigger."""
-        if self.get_current_distribution_conditions()["force_freegame"] and len(
-            self.special_syms_on_board[scatter_key]
+        if self.get_current_distribution_conditions()["force_freegame"] and self.count_special_symbols(
+            scatter_key
         ) >= min(self.config.freespin_triggers[self.gametype].keys()):
             return True
         self.repeat = True
@@ -6,9 +6,10 @@ from copy import deepcopy
 class Book:
     "Stores simulation information."
 
-    def __init__(self, book_id: int, criteria: str):
-        "Initialize simulation book"
+    def __init__(self, book_id: int, criteria: str, record_events: bool = True):
+        "Initialize simulation book, events are ignored if record_events is False (stats-only runs)."
         self.id = book_id
+        self.record_events = record_events
         self.payout_multiplier = 0.0
         self.events = []
         self.criteria = criteria
@@ -16,13 +17,20 @@ class Book:
         self.freegame_wins = 0.0
 
     def add_event(self, event: dict):
-        "Append event to book."
-        self.events.append(deepcopy(event))
+        """Append event to book without copying it.
+
+        The book takes ownership of the event, so events must be built from fresh objects rather than
+        references to gamestate values which are later changed (copy those when building the event).
+        """
+        if self.record_events:
+            self.events.append(event)
 
     def append_book_items(self, event_id: int, appended_info: dict):
         "Modify an existing book event at position 'event_id'"
+        if not self.record_events:
+            return
         for k, v in appended_info.items():
-            self.events[event_id][k] = v
+            self.events[event_id][k] = deepcopy(v)
 
     def to_json(self):
         "Return JSON-ready object."
@@ -1,13 +1,17 @@
 import time
+import math
 import random
-from multiprocessing import Process, Manager
+from copy import deepcopy
+from multiprocessing import Pool
 import cProfile
 from warnings import warn
-import shutil
 import asyncio
-from typing import Dict
+from typing import Dict, List, Tuple
 
-from src.write_data.write_data import output_lookup_and_force_files
+from src.write_data.write_data import ChunkMerger
+
+CHUNK_WINDOW_PER_WORKER = 2
+MAX_UNCOMPRESSED_CHUNK_SIZE = 1000
 
 
 def create_books(
@@ -18,13 +22,45 @@ def create_books(
     threads: int,
     compress: bool,
     profiling: bool,
+    chunk_size: int = None,
+    criteria_costs: Dict[str, float] = None,
+    books_per_frame: int = None,
+    stats_only: bool = False,
+    binary_books: bool = False,
+    compression_level: int = 3,
+    compression_threads: int = 0,
+    dictionary_size: int = None,
 ):
-    """Main run-function for simulating game outcomes and outputting all files."""
+    """Main run-function for simulating game outcomes and outputting all files.
+
+    Simulations are split into chunks of at most `batch_size` sims (or `chunk_size` if given, at most
+    MAX_UNCOMPRESSED_CHUNK_SIZE without compression), which are handed to whichever worker is free. Within each window of CHUNK_WINDOW_PER_WORKER chunks
+    per worker, chunks with the highest estimated cost, using `criteria_costs` or estimate_criteria_costs(),
+    are started first.
+
+    With `books_per_frame` set, compressed books are written as a seekable archive of frames
+    holding that many books, with a book id index in the books folder (see write_data.book_archive).
+    Chunk sizes are then rounded up to whole frames, which are compressed by the workers.
+
+    With `stats_only`, events are not constructed and no books are written. Only the lookup tables,
+    segmented lookup tables and force files are output, which is sufficient for RTP and hit-rate analysis.
+
+    With `binary_books`, workers encode books in the compact binary format of write_data.book_codec,
+    written to an intermediate file in the books folder. Once a bet mode is finished, it is transcoded
+    into the .jsonl.zst books required by the RGS (write_data.publish_binary_books()).
+
+    Compressed book files use zstd `compression_level` with `compression_threads` worker threads
+    (0 compresses in the calling thread). With `dictionary_size` and `books_per_frame`, a second archive of
+    the books is written to books/books_<mode>.archive.zst, compressed with a dictionary trained on the
+    first books (books/books_<mode>.dict). The published books are never compressed with the dictionary.
+    """
+    if binary_books and books_per_frame:
+        raise ValueError("Binary books cannot be written as a seekable archive, publish them first.")
+    if dictionary_size and not (books_per_frame and compress):
+        raise ValueError(
+            "Trained dictionaries are only used for the frames of a compressed seekable archive (books_per_frame)."
+        )
     for key, ns in num_sim_args.items():
-        if all([ns > 0, ns > batch_size * batch_size]):
-            assert (
-                ns % (threads * batch_size) == 0
-            ), "mode-sims/(batch * threads) must be divisible with no remainder"
         num_sim_args[key] = int(ns)
 
     if not compress and sum(num_sim_args.values()) > 1e4:
@@ -35,33 +71,122 @@ def create_books(
 
     startTime = time.time()
     print("\nCreating books...")
-    for betmode_name in num_sim_args:
-        if num_sim_args[betmode_name] > 0:
-            gamestate.betmode = betmode_name
-            run_multi_process_sims(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=num_sim_args[betmode_name],
-                compress=compress,
-                write_event_list=config.write_event_list,
-                profiling=profiling,
-            )
-            output_lookup_and_force_files(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=num_sim_args[betmode_name],
-                compress=compress,
-            )  # , write_event_list=config.write_event_list)
-    shutil.rmtree(gamestate.output_files.temp_path)
+    pool = create_worker_pool(gamestate, threads) if threads > 1 and not profiling else None
+    try:
+        for betmode_name in num_sim_args:
+            if num_sim_args[betmode_name] > 0:
+                gamestate.betmode = betmode_name
+                if profiling:
+                    mode_chunk_size = num_sim_args[betmode_name]
+                else:
+                    mode_chunk_size = get_chunk_size(
+                        num_sim_args[betmode_name], threads, batch_size, compress, chunk_size, books_per_frame
+                    )
+                sim_chunks = get_sim_chunks(num_sim_args[betmode_name], mode_chunk_size)
+                run_multi_process_sims(
+                    threads,
+                    batch_size,
+                    config.game_id,
+                    betmode_name,
+                    gamestate,
+                    num_sims=num_sim_args[betmode_name],
+                    compress=compress,
+                    write_event_list=config.write_event_list,
+                    profiling=profiling,
+                    pool=pool,
+                    sim_chunks=sim_chunks,
+                    criteria_costs=criteria_costs,
+                    books_per_frame=books_per_frame,
+                    stats_only=stats_only,
+                    binary_books=binary_books,
+                    compression_level=compression_level,
+                    compression_threads=compression_threads,
+                    dictionary_size=dictionary_size,
+                )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
     print("\nFinished creating books in", time.time() - startTime, "seconds.\n")
 
 
+def get_default_chunk_size(num_sims: int, threads: int, batch_size: int) -> int:
+    """Aim for ~20 chunks per worker so that slow chunks can be balanced out, capped at batch_size."""
+    return max(1, min(batch_size, -(-num_sims // (threads * 20))))
+
+
+def get_chunk_size(
+    num_sims: int,
+    threads: int,
+    batch_size: int,
+    compress: bool,
+    chunk_size: int = None,
+    books_per_frame: int = None,
+) -> int:
+    """Simulations per chunk: `chunk_size` if given, the default chunk size otherwise.
+
+    Workers hold the books of a whole chunk in memory until it is handed to the parent (see BookWriter).
+    Uncompressed chunks are capped at MAX_UNCOMPRESSED_CHUNK_SIZE books, compressed chunks are rounded up
+    to whole frames with `books_per_frame`.
+    """
+    chunk_size = chunk_size or get_default_chunk_size(num_sims, threads, batch_size)
+    if not compress:
+        return min(chunk_size, MAX_UNCOMPRESSED_CHUNK_SIZE)
+    if books_per_frame:
+        return get_frame_chunk_size(chunk_size, books_per_frame)
+    return chunk_size
+
+
+def get_frame_chunk_size(chunk_size: int, books_per_frame: int) -> int:
+    """Round the chunk size up to whole archive frames, so that workers can compress every frame."""
+    return -(-chunk_size // books_per_frame) * books_per_frame
+
+
+def get_sim_chunks(num_sims: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split simulation numbers [0, num_sims) into contiguous (first_sim, num_sims) chunks."""
+    return [(first_sim, min(chunk_size, num_sims - first_sim)) for first_sim in range(0, num_sims, chunk_size)]
+
+
+def estimate_criteria_costs(gamestate: object, betmode_name: str) -> Dict[str, float]:
+    """Relative simulation cost for each criteria, from the distribution conditions.
+
+    Forced max-wins are usually the slowest to satisfy, followed by forced freegames.
+    """
+    criteria_costs = {}
+    for d in gamestate.get_betmode(betmode_name).get_distributions():
+        if d._conditions.get("force_wincap"):
+            criteria_costs[d._criteria] = 100.0
+        elif d._conditions.get("force_freegame"):
+            criteria_costs[d._criteria] = 10.0
+        else:
+            criteria_costs[d._criteria] = 1.0
+    return criteria_costs
+
+
+def order_chunks_by_cost(
+    sim_chunks: List[Tuple[int, int]],
+    sim_allocation: Dict[int, str],
+    criteria_costs: Dict[str, float],
+    window: int = None,
+) -> List[int]:
+    """Chunk indices sorted so that the most expensive chunks are scheduled first, within consecutive
+    windows of `window` chunks (all chunks if None).
+
+    Chunks are written in simulation order, so a finished chunk waits in memory until every earlier
+    chunk is written. The window bounds how late a chunk is scheduled, and with it how many chunks wait.
+    """
+    chunk_costs = [
+        sum(criteria_costs.get(sim_allocation[sim], 1.0) for sim in range(first_sim, first_sim + num_sims))
+        for first_sim, num_sims in sim_chunks
+    ]
+    window = window or len(sim_chunks)
+    return [
+        idx
+        for start in range(0, len(sim_chunks), window)
+        for idx in sorted(range(start, min(start + window, len(sim_chunks))), key=lambda idx: -chunk_costs[idx])
+    ]
+
+
 def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[str, int]:
     """Ensure assignment of criteria to all simulations numbers."""
     betmode_distributions = gamestate.get_betmode(betmode_name).get_distributions()
@@ -88,28 +213,104 @@ def assign_sim_criteria(num_sims_criteria: Dict[str, int], sims: int) -> Dict[in
     return {i: simAllocation[i] for i in range(min(sims, len(simAllocation)))}
 
 
+_worker_gamestate = None
+
+
+def init_worker(gamestate: object) -> None:
+    """Store the gamestate template handed to a long-lived pool worker."""
+    global _worker_gamestate
+    _worker_gamestate = gamestate
+
+
+def create_worker_pool(gamestate: object, threads: int) -> Pool:
+    """Start worker processes once, shared by every batch and bet mode of a create_books() call."""
+    print("Starting", threads, "worker processes.")
+    return Pool(processes=threads, initializer=init_worker, initargs=(gamestate,))
+
+
+def copy_gamestate(gamestate: object) -> object:
+    """Fresh gamestate for a batch job. The (read-only) config and any caches returned by
+    get_shared_objects() are shared rather than copied."""
+    return deepcopy(gamestate, {id(obj): obj for obj in gamestate.get_shared_objects()})
+
+
+def run_chunk_job(job: tuple) -> tuple:
+    """Run one chunk of simulations on a copy of the worker gamestate, return its bet mode configs and output."""
+    gamestate = copy_gamestate(_worker_gamestate)
+    betmode_copy_list = []
+    chunk_output = gamestate.run_sims(betmode_copy_list, *job)
+    return betmode_copy_list, chunk_output
+
+
+def get_chunk_job(
+    betmode: str,
+    sim_allocation: Dict[int, str],
+    sim_chunks: List[Tuple[int, int]],
+    chunk_index: int,
+    compress: bool,
+    write_event_list: bool,
+    stats_only: bool = False,
+    binary_books: bool = False,
+    compression_level: int = 3,
+    compression_threads: int = 0,
+    books_per_frame: int = None,
+) -> tuple:
+    """Arguments to run_sims() for a single chunk, carrying only the criteria it simulates."""
+    first_sim, num_sims = sim_chunks[chunk_index]
+    chunk_allocation = {sim: sim_allocation[sim] for sim in range(first_sim, first_sim + num_sims)}
+    return (
+        betmode,
+        chunk_allocation,
+        first_sim,
+        num_sims,
+        chunk_index,
+        compress,
+        write_event_list,
+        stats_only,
+        binary_books,
+        compression_level,
+        compression_threads,
+        books_per_frame,
+    )
+
+
 async def profile_and_visualize(
     game_id,
     gamestate,
     all_betmode_configs,
     betmode,
     sim_allocation,
-    threads,
-    num_repeats,
-    sims_per_thread,
-    repeat,
     compress,
     write_event_list,
+    stats_only=False,
+    binary_books=False,
+    compression_level=3,
+    compression_threads=0,
+    books_per_frame=None,
 ):
-    """Create flame-graph, automatically opens output on localhost."""
+    """Create flame-graph, automatically opens output on localhost. Returns the profiled chunk output."""
     output_string = f"games/{game_id}/simulationProfile_{betmode}.prof"
-    cProfile.runctx(
-        "gamestate.run_sims(all_betmode_configs, betmode, sim_allocation, threads, num_repeats, sims_per_thread, 0, repeat, compress, write_event_list)",
-        globals(),
-        locals(),
-        output_string,
+    num_sims = len(sim_allocation)
+    profiler = cProfile.Profile()
+    chunk_output = profiler.runcall(
+        gamestate.run_sims,
+        all_betmode_configs,
+        betmode,
+        sim_allocation,
+        0,
+        num_sims,
+        0,
+        compress,
+        write_event_list,
+        stats_only,
+        binary_books,
+        compression_level,
+        compression_threads,
+        books_per_frame,
     )
+    profiler.dump_stats(output_string)
     await asyncio.create_subprocess_exec("snakeviz", output_string)
+    return chunk_output
 
 
 def run_multi_process_sims(
@@ -122,70 +323,126 @@ def run_multi_process_sims(
     compress: bool = True,
     write_event_list: bool = False,
     profiling: bool = False,
+    pool: Pool = None,
+    sim_chunks: List[Tuple[int, int]] = None,
+    criteria_costs: Dict[str, float] = None,
+    books_per_frame: int = None,
+    stats_only: bool = False,
+    binary_books: bool = False,
+    compression_level: int = 3,
+    compression_threads: int = 0,
+    dictionary_size: int = None,
 ):
-    """Setup multiprocessing manager for running all game-mode simulations."""
+    """Schedule all chunks of a game-mode on the worker pool (or run them in-process if there is none).
+
+    Chunk outputs are merged into the final book, lookup and force files as they arrive.
+    """
     print("\nCreating books for", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
-    sims_per_thread = int(num_sims / threads / num_repeats)
+    if sim_chunks is None:
+        chunk_size = get_chunk_size(num_sims, threads, batching_size, compress, books_per_frame=books_per_frame)
+        sim_chunks = get_sim_chunks(num_sims, chunk_size)
     num_sims_criteria = get_sim_splits(gamestate, num_sims, betmode)
     sim_allocation = assign_sim_criteria(num_sims_criteria, num_sims)
-    for repeat in range(num_repeats):
-        print("Batch", repeat + 1, "of", num_repeats)
-        processes = []
-        manager = Manager()
-        all_betmode_configs = manager.list()
-        if profiling:
-            asyncio.run(
-                profile_and_visualize(
-                    game_id=game_id,
-                    gamestate=gamestate,
-                    all_betmode_configs=all_betmode_configs,
-                    betmode=betmode,
-                    sim_allocation=sim_allocation,
-                    threads=threads,
-                    num_repeats=num_repeats,
-                    sims_per_thread=sims_per_thread,
-                    repeat=repeat,
-                    compress=compress,
-                    write_event_list=write_event_list,
-                )
-            )
-        elif threads == 1:
-            gamestate.run_sims(
-                betmode_copy_list=all_betmode_configs,
+
+    merger = ChunkMerger(
+        gamestate,
+        game_id,
+        betmode,
+        compress=compress,
+        books_per_frame=books_per_frame,
+        stats_only=stats_only,
+        binary_books=binary_books,
+        compression_level=compression_level,
+        compression_threads=compression_threads,
+        dictionary_size=dictionary_size,
+    )
+    if profiling:
+        chunk_output = asyncio.run(
+            profile_and_visualize(
+                game_id=game_id,
+                gamestate=gamestate,
+                all_betmode_configs=[],
                 betmode=betmode,
-                sim_to_criteria=sim_allocation,
-                total_threads=threads,
-                total_repeats=num_repeats,
-                num_sims=sims_per_thread,
-                thread_index=0,
-                repeat_count=repeat,
+                sim_allocation=sim_allocation,
                 compress=compress,
                 write_event_list=write_event_list,
+                stats_only=stats_only,
+                binary_books=binary_books,
+                compression_level=compression_level,
+                compression_threads=compression_threads,
+                books_per_frame=books_per_frame,
             )
-        else:
-            for thread in range(threads):
-                process = Process(
-                    target=gamestate.run_sims,
-                    args=(
-                        all_betmode_configs,
-                        betmode,
-                        sim_allocation,
-                        threads,
-                        num_repeats,
-                        sims_per_thread,
-                        thread,
-                        repeat,
-                        compress,
-                        write_event_list,
-                    ),
-                )
-                print("Started thread", thread)
-                process.start()
-                processes += [process]
-            print("All threads are online.")
-            for process in processes:
-                process.join()
-            print("Finished joining threads.")
-            gamestate.combine(all_betmode_configs, betmode)
-            gamestate.get_betmode(betmode).lock_force_keys()
+        )
+        merger.add_chunk(chunk_output)
+        merger.close(write_event_list)
+        return
+
+    if criteria_costs is None:
+        criteria_costs = estimate_criteria_costs(gamestate, betmode)
+    jobs = [
+        get_chunk_job(
+            betmode,
+            sim_allocation,
+            sim_chunks,
+            chunk_index,
+            compress,
+            write_event_list,
+            stats_only,
+            binary_books,
+            compression_level,
+            compression_threads,
+            books_per_frame,
+        )
+        for chunk_index in order_chunks_by_cost(
+            sim_chunks, sim_allocation, criteria_costs, CHUNK_WINDOW_PER_WORKER * max(1, threads)
+        )
+    ]
+    if pool is None:
+        results = (run_chunk_locally(gamestate, job) for job in jobs)
+    else:
+        results = pool.imap_unordered(run_chunk_job, jobs)
+
+    all_betmode_configs = []
+    cache_stats = {}
+    # Chunks arrive in any order, wins are summed exactly (math.fsum) so the RTP does not depend on it
+    total_wins, base_wins, free_wins = [], [], []
+    for finished, (betmode_configs, chunk_output) in enumerate(results):
+        all_betmode_configs += betmode_configs
+        merger.add_chunk(chunk_output)
+        for cache_name, stats in chunk_output["cache_stats"].items():
+            for key in ["hits", "misses", "skipped"]:
+                cache_stats.setdefault(cache_name, {"hits": 0, "misses": 0, "skipped": 0})[key] += stats[key]
+        win_manager = chunk_output["win_manager"]
+        total_wins.append(win_manager.total_cumulative_wins)
+        base_wins.append(win_manager.cumulative_base_wins)
+        free_wins.append(win_manager.cumulative_free_wins)
+        if (finished + 1) % max(1, len(jobs) // 10) == 0 or finished + 1 == len(jobs):
+            print("Finished chunk", finished + 1, "of", len(jobs), flush=True)
+
+    total_wins, base_wins, free_wins = math.fsum(total_wins), math.fsum(base_wins), math.fsum(free_wins)
+    mode_cost = gamestate.get_betmode(betmode).get_cost()
+    print(
+        betmode,
+        "finished with",
+        round(total_wins / (num_sims * mode_cost), 3),
+        "RTP.",
+        f"[baseGame: {round(base_wins / (num_sims * mode_cost), 3)}, freeGame: {round(free_wins / (num_sims * mode_cost), 3)}]",
+        flush=True,
+    )
+    for cache_name, stats in cache_stats.items():
+        lookups = stats["hits"] + stats["misses"]
+        print(
+            f"{cache_name} cache hit rate: {round(stats['hits'] / lookups if lookups > 0 else 0.0, 3)}",
+            f"[hits: {stats['hits']}, misses: {stats['misses']}, skipped: {stats['skipped']}]",
+            flush=True,
+        )
+    merger.close(write_event_list)
+    gamestate.combine(all_betmode_configs, betmode)
+    gamestate.get_betmode(betmode).lock_force_keys()
+
+
+def run_chunk_locally(gamestate: object, job: tuple) -> tuple:
+    """In-process equivalent of run_chunk_job(), used when there is no worker pool."""
+    betmode_copy_list = []
+    chunk_output = copy_gamestate(gamestate).run_sims(betmode_copy_list, *job)
+    return betmode_copy_list, chunk_output
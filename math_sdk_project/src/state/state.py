@@ -2,36 +2,39 @@ from copy import copy
 from abc import ABC, abstractmethod
 from warnings import warn
 import random
+import sys
 
 # from src.config.config import BetMode
 from src.wins.win_manager import WinManager
 from src.calculations.symbol import SymbolStorage
 from src.config.output_filenames import OutputFiles
 from src.state.books import Book
-from src.write_data.write_data import (
-    print_recorded_wins,
-    make_lookup_tables,
-    write_json,
-    make_lookup_pay_split,
-    write_library_events,
-)
+from src.calculations.statistics import cache_samplers
+from src.write_data.book_codec import BookEncoder, get_book_schema
+from src.write_data.book_writer import BookWriter
 
 
 class GeneralGameState(ABC):
     """Master gamestate which other classes inherit from."""
 
+    _betmode_indices = None
+    _mode_lookup = None
+
     def __init__(self, config):
         self.config = config
         self.output_files = OutputFiles(self.config)
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type)
         self.library = {}
+        self.book_writer = None
         self.recorded_events = {}
         self.special_symbol_functions = {}
         self.temp_wins = []
         self.create_symbol_map()
         self.assign_special_sym_function()
+        self.cache_distribution_samplers()
         self.sim = 0
         self.criteria = ""
+        self.record_events = True
         self.book = Book(self.sim, self.criteria)
         self.repeat = True
         self.repeat_count = 0
@@ -56,6 +59,12 @@ class GeneralGameState(ABC):
         all_symbols_list = list(all_symbols_list)
         self.symbol_storage = SymbolStorage(self.config, all_symbols_list)
 
+    def cache_distribution_samplers(self) -> None:
+        """Precompute samplers for the weighted outcomes in all betmode distribution conditions."""
+        for betmode in self.config.bet_modes:
+            for distribution in betmode.get_distributions():
+                cache_samplers(distribution._conditions, self.config.exact_rng_sampling)
+
     @abstractmethod
     def assign_special_sym_function(self):
         """ "Define custom symbol functions in game_override."""
@@ -68,7 +77,7 @@ class GeneralGameState(ABC):
         self.top_symbols = None
         self.bottom_symbols = None
         self.book_id = self.sim + 1
-        self.book = Book(self.book_id, self.criteria)
+        self.book = Book(self.book_id, self.criteria, self.record_events)
         self.win_data = {
             "totalWin": 0,
             "wins": [],
@@ -97,33 +106,74 @@ class GeneralGameState(ABC):
         self.gametype = self.config.freegame_type
         self.win_manager.reset_spin_win()
 
+    @property
+    def betmode(self) -> str:
+        """Name of the active betmode."""
+        return self._betmode
+
+    @betmode.setter
+    def betmode(self, betmode: str) -> None:
+        self._betmode = betmode
+        self._mode_lookup = None
+
+    @property
+    def criteria(self) -> str:
+        """Criteria of the active distribution."""
+        return self._criteria
+
+    @criteria.setter
+    def criteria(self, criteria: str) -> None:
+        self._criteria = criteria
+        self._mode_lookup = None
+
+    def get_betmode_indices(self) -> dict:
+        """Position of each betmode name within config.bet_modes."""
+        if self._betmode_indices is None:
+            self._betmode_indices = {}
+            for idx, betmode in enumerate(self.config.bet_modes):
+                self._betmode_indices.setdefault(betmode.get_name(), idx)
+        return self._betmode_indices
+
+    def get_mode_lookup(self) -> tuple:
+        """Positions of the current betmode and criteria distribution, found once per betmode/criteria change.
+        Positions (rather than objects) are stored so that copied gamestates keep sharing the config."""
+        if self._mode_lookup is None:
+            betmode_idx = self.get_betmode_indices().get(self._betmode)
+            distribution_idx = None
+            if betmode_idx is not None:
+                for idx, d in enumerate(self.config.bet_modes[betmode_idx].get_distributions()):
+                    if d._criteria == self._criteria:
+                        distribution_idx = idx
+                        break
+            self._mode_lookup = (betmode_idx, distribution_idx)
+        return self._mode_lookup
+
     def get_betmode(self, mode_name) -> object:
         """Return all current betmode information."""
-        for betmode in self.config.bet_modes:
-            if betmode.get_name() == mode_name:
-                return betmode
+        betmode_idx = self.get_betmode_indices().get(mode_name)
+        if betmode_idx is not None:
+            return self.config.bet_modes[betmode_idx]
         print("\nWarning: betmode couldn't be retrieved\n")
 
     def get_current_betmode(self) -> object:
         """Get current betmode information."""
-        for betmode in self.config.bet_modes:
-            if betmode.get_name() == self.betmode:
-                return betmode
+        betmode_idx = self.get_mode_lookup()[0]
+        if betmode_idx is not None:
+            return self.config.bet_modes[betmode_idx]
 
     def get_current_betmode_distributions(self) -> object:
         """Return current betmode criteria information."""
-        dist = self.get_current_betmode().get_distributions()
-        for c in dist:
-            if c._criteria == self.criteria:
-                return c
-        raise RuntimeError("Could not locate criteria distribution.")
+        betmode_idx, distribution_idx = self.get_mode_lookup()
+        if distribution_idx is None:
+            raise RuntimeError("Could not locate criteria distribution.")
+        return self.config.bet_modes[betmode_idx].get_distributions()[distribution_idx]
 
     def get_current_distribution_conditions(self) -> dict:
         """Return requirements for criteria setup/acceptance."""
-        for d in self.get_betmode(self.betmode).get_distributions():
-            if d._criteria == self.criteria:
-                return d._conditions
-        return RuntimeError("Could not locate betmode conditions")
+        betmode_idx, distribution_idx = self.get_mode_lookup()
+        if distribution_idx is None:
+            return RuntimeError("Could not locate betmode conditions")
+        return self.config.bet_modes[betmode_idx].get_distributions()[distribution_idx]._conditions
 
     def check_current_repeat_count(self, warn_after_count: int = 1000):
         """Alert user to high repeat count."""
@@ -163,7 +213,8 @@ class GeneralGameState(ABC):
                     self.get_betmode(betmode_name).add_force_key(key)  # type:ignore
 
     def imprint_wins(self) -> None:
-        """Record all events to library if criteria conditions are satisfied."""
+        """Record all events once criteria conditions are satisfied.
+        Books are streamed to the open book writer, or kept in the library if there is none."""
         for temp_win_index in range(int(len(self.temp_wins) / 2)):
             description = tuple(sorted(self.temp_wins[2 * temp_win_index].items()))
             book_id = self.temp_wins[2 * temp_win_index + 1]
@@ -179,7 +230,10 @@ class GeneralGameState(ABC):
                     "bookIds": [book_id],
                 }
         self.temp_wins = []
-        self.library[self.sim + 1] = copy(self.book.to_json())
+        if self.book_writer is not None:
+            self.book_writer.write_book(self.book.to_json())
+        else:
+            self.library[self.sim + 1] = copy(self.book.to_json())
         self.win_manager.update_end_round_wins()
 
     def update_final_win(self) -> None:
@@ -219,6 +273,15 @@ class GeneralGameState(ABC):
         self.repeat_count += 1
         self.check_current_repeat_count()
 
+    def get_shared_objects(self) -> list:
+        """Objects shared by every gamestate copied for a chunk of simulations, rather than copied with it.
+        Games can add caches which remain valid across simulations."""
+        return [self.config]
+
+    def collect_cache_stats(self) -> dict:
+        """Counters of game specific caches since they were last collected, reported after each bet mode."""
+        return {}
+
     @abstractmethod
     def run_spin(self, sim):
         """run_spin should be defined in gamestate."""
@@ -234,46 +297,49 @@ class GeneralGameState(ABC):
         betmode_copy_list,
         betmode,
         sim_to_criteria,
-        total_threads,
-        total_repeats,
+        first_sim,
         num_sims,
-        thread_index,
-        repeat_count,
+        chunk_index,
         compress=True,
         write_event_list=True,
-    ) -> None:
-        """Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished."""
+        stats_only=False,
+        binary_books=False,
+        compression_level=3,
+        compression_threads=0,
+        books_per_frame=None,
+    ) -> dict:
+        """Assigns criteria and runs simulations [first_sim, first_sim + num_sims).
+        Books are serialized in memory and returned with the chunk_index, to be merged in simulation order by write_data.ChunkMerger.
+        With stats_only, events are not recorded and only lookup table lines and force records are returned.
+        With binary_books, books are encoded as binary records (see write_data.book_codec) instead of JSON.
+        Compressed books are returned as finished zstd frames, one per books_per_frame books if given."""
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type)
         self.library = {}
         self.betmode = betmode
         self.num_sims = num_sims
-        for sim in range(
-            thread_index * num_sims + (total_threads * num_sims) * repeat_count,
-            (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count,
-        ):
-            self.criteria = sim_to_criteria[sim]
-            self.run_spin(sim)
-        mode_cost = self.get_current_betmode().get_cost()
-
-        print(
-            "Thread " + str(thread_index),
-            "finished with",
-            round(self.win_manager.total_cumulative_wins / (num_sims * mode_cost), 3),
-            "RTP.",
-            f"[baseGame: {round(self.win_manager.cumulative_base_wins/(num_sims*mode_cost), 3)}, freeGame: {round(self.win_manager.cumulative_free_wins/(num_sims*mode_cost), 3)}]",
-            flush=True,
+        self.record_events = not stats_only
+        self.cache_distribution_samplers()
+        self.book_writer = BookWriter(
+            compress,
+            output_regular_json=self.config.output_regular_json,
+            record_event_list=write_event_list and not stats_only,
+            write_books=not stats_only,
+            book_encoder=BookEncoder(get_book_schema(self.config)) if binary_books else None,
+            compression_level=compression_level,
+            compression_threads=compression_threads,
+            books_per_frame=books_per_frame,
         )
-
-        write_json(
-            self,
-            self.output_files.get_temp_multi_thread_name(
-                betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
-            ),
-        )
-        print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
-        make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
-        make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
-
-        if write_event_list:
-            write_library_events(self, list(self.library.values()), betmode)
+        try:
+            for sim in range(first_sim, first_sim + num_sims):
+                self.criteria = sys.intern(sim_to_criteria[sim])
+                self.run_spin(sim)
+        finally:
+            chunk_output = self.book_writer.close()
+            self.book_writer = None
+
+        chunk_output["chunk_index"] = chunk_index
+        chunk_output["recorded_events"] = self.recorded_events
+        chunk_output["win_manager"] = self.win_manager
+        chunk_output["cache_stats"] = self.collect_cache_stats()
         betmode_copy_list.append(self.config.bet_modes)
+        return chunk_output
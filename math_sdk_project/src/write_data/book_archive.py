@@ -0,0 +1,164 @@
+"""Seekable compressed book archives: independent zstd frames of books plus a binary id index."""
+
+import io
+import json
+import struct
+import sys
+from array import array
+import zstandard as zstd
+
+INDEX_MAGIC = b"BOOKIDX1"
+INDEX_HEADER = struct.Struct("<8sIQQ")  # magic, books_per_frame, num_books, num_frames
+
+
+class SeekableBookWriter:
+    """
+    Writes newline separated books as independent zstd frames of `books_per_frame` books.
+    Concatenated frames form a regular .jsonl.zst stream, so the archive can still be read from
+    start to finish. The frame byte offsets and the position of each book within its frame are
+    kept so that write_index() can output the lookup used by BookArchiveReader.
+
+    Frames are compressed with `compressor` (default settings if None). If it uses a trained
+    dictionary (see train_book_dictionary), the same dictionary is needed to read the archive.
+    """
+
+    def __init__(
+        self, books_file: io.BufferedWriter, books_per_frame: int, compressor: zstd.ZstdCompressor = None
+    ):
+        assert books_per_frame > 0, "books_per_frame must be a positive integer."
+        self.books_file = books_file
+        self.books_per_frame = books_per_frame
+        self.compressor = compressor or zstd.ZstdCompressor()
+        self.frame_lines = []
+        self.frame_offsets = array("Q", [0])
+        self.book_ids = array("Q")
+        self.line_offsets = array("I")
+
+    def write_books(self, book_lines: bytes, book_ids: list) -> None:
+        """Add newline terminated books, flushing a frame every `books_per_frame` books."""
+        lines = book_lines.splitlines(keepends=True)
+        if len(lines) != len(book_ids):
+            raise RuntimeError(f"Received {len(lines)} books with {len(book_ids)} book ids.")
+        for line, book_id in zip(lines, book_ids):
+            self.add_book(line, book_id)
+
+    def add_book(self, book_line: bytes, book_id: int) -> None:
+        """Add a single newline terminated book."""
+        self.book_ids.append(book_id)
+        self.frame_lines.append(book_line)
+        if len(self.frame_lines) == self.books_per_frame:
+            self.write_frame()
+
+    def write_frames(self, frames: bytes, frame_offsets: array, book_ids: list, line_offsets: array) -> None:
+        """
+        Append the frames of another archive with the same books_per_frame, such as those compressed
+        by a simulation worker. Every frame written so far must hold books_per_frame books.
+        """
+        if len(self.frame_lines) > 0 or len(self.book_ids) % self.books_per_frame != 0:
+            raise RuntimeError("Frames can only be appended to an archive of complete frames.")
+        start = self.frame_offsets[-1]
+        self.books_file.write(frames)
+        self.frame_offsets.extend(start + offset for offset in frame_offsets[1:])
+        self.book_ids.extend(book_ids)
+        self.line_offsets.extend(line_offsets)
+
+    def write_frame(self) -> None:
+        """Compress the buffered books into a single frame."""
+        frame_offset = 0
+        for line in self.frame_lines:
+            self.line_offsets.append(frame_offset)
+            frame_offset += len(line)
+        frame = self.compressor.compress(b"".join(self.frame_lines))
+        self.books_file.write(frame)
+        self.frame_offsets.append(self.frame_offsets[-1] + len(frame))
+        self.frame_lines = []
+
+    def close(self) -> None:
+        """Flush the final (partial) frame."""
+        if len(self.frame_lines) > 0:
+            self.write_frame()
+
+    def write_index(self, index_filename: str) -> None:
+        """Write the header, frame offsets, book ids and in-frame offsets as little-endian arrays."""
+        num_frames = len(self.frame_offsets) - 1
+        with open(index_filename, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.books_per_frame, len(self.book_ids), num_frames))
+            for values in [self.frame_offsets, self.book_ids, self.line_offsets]:
+                values = array(values.typecode, values)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                values.tofile(f)
+
+
+class BookArchiveReader:
+    """
+    Random access to the books of a seekable archive. A single book only requires reading and
+    decompressing the frame containing it. The most recently used frame is kept decompressed,
+    so reading neighbouring book ids is cheap. Archives compressed with a trained dictionary
+    require its `dictionary_filename`.
+    """
+
+    def __init__(self, books_filename: str, index_filename: str, dictionary_filename: str = None):
+        self.books_filename = books_filename
+        if dictionary_filename is not None:
+            with open(dictionary_filename, "rb") as f:
+                self.decompressor = zstd.ZstdDecompressor(dict_data=zstd.ZstdCompressionDict(f.read()))
+        else:
+            self.decompressor = zstd.ZstdDecompressor()
+        with open(index_filename, "rb") as f:
+            magic, self.books_per_frame, self.num_books, num_frames = INDEX_HEADER.unpack(
+                f.read(INDEX_HEADER.size)
+            )
+            if magic != INDEX_MAGIC:
+                raise RuntimeError(f"{index_filename} is not a book archive index.")
+            self.frame_offsets = read_array(f, "Q", num_frames + 1)
+            book_ids = read_array(f, "Q", self.num_books)
+            self.line_offsets = read_array(f, "I", self.num_books)
+        self.book_positions = {book_id: position for position, book_id in enumerate(book_ids)}
+        self.cached_frame = (None, b"")
+
+    def __len__(self) -> int:
+        return self.num_books
+
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self.book_positions
+
+    def get_frame(self, frame: int) -> bytes:
+        """Decompressed contents of a single frame."""
+        if self.cached_frame[0] != frame:
+            with open(self.books_filename, "rb") as f:
+                f.seek(self.frame_offsets[frame])
+                compressed = f.read(self.frame_offsets[frame + 1] - self.frame_offsets[frame])
+            self.cached_frame = (frame, self.decompressor.decompress(compressed))
+        return self.cached_frame[1]
+
+    def get_book_line(self, book_id: int) -> bytes:
+        """Raw JSON line of a book, without decoding it."""
+        if book_id not in self.book_positions:
+            raise KeyError(f"Book id {book_id} is not in {self.books_filename}.")
+        position = self.book_positions[book_id]
+        frame_data = self.get_frame(position // self.books_per_frame)
+        start = self.line_offsets[position]
+        end = frame_data.index(b"\n", start)
+        return frame_data[start:end]
+
+    def get_book(self, book_id: int) -> dict:
+        """Decoded book for a given book id."""
+        return json.loads(self.get_book_line(book_id))
+
+
+def read_array(f: io.BufferedReader, typecode: str, length: int) -> array:
+    """Read `length` little-endian values of a given typecode."""
+    values = array(typecode)
+    values.fromfile(f, length)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def train_book_dictionary(book_lines: list, dictionary_size: int) -> zstd.ZstdCompressionDict:
+    """Zstd dictionary trained on sample books (one JSON line each), None if there are too few samples."""
+    try:
+        return zstd.train_dictionary(dictionary_size, book_lines)
+    except zstd.ZstdError:
+        return None
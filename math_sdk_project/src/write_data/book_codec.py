@@ -0,0 +1,289 @@
+"""Compact binary book encoding for intermediate book files, and its transcoder to JSON lines."""
+
+import io
+import json
+import struct
+import sys
+from typing import Iterable, Iterator, List
+import zstandard as zstd
+from src.events.event_constants import EventConstants
+
+BINARY_BOOKS_MAGIC = b"BOOKBIN2"
+RECORD_LENGTH = struct.Struct("<I")
+
+BOOK_KEYS = ["id", "payoutMultiplier", "events", "criteria", "baseGameWins", "freeGameWins"]
+EVENT_KEYS = [
+    "index",
+    "type",
+    "board",
+    "name",
+    "reel",
+    "row",
+    "amount",
+    "totalWin",
+    "wins",
+    "symbol",
+    "kind",
+    "win",
+    "ways",
+    "positions",
+    "meta",
+    "gameType",
+    "paddingPositions",
+    "anticipation",
+    "multiplier",
+    "winWithoutMult",
+    "globalMult",
+    "lineIndex",
+    "lineMultiplier",
+    "symbolMult",
+    "clusterMult",
+    "clusterSize",
+    "overlay",
+    "winLevel",
+    "totalFs",
+    "fs",
+    "newSymbols",
+    "explodingSymbols",
+]
+
+
+def get_book_schema(config: object) -> List[str]:
+    """
+    Strings repeated throughout the books of a game: book and event keys, event types, criteria,
+    symbol names and special symbol types. Encoded books refer to these by index.
+    """
+    schema = BOOK_KEYS + EVENT_KEYS + [event.value for event in EventConstants]
+    schema += [config.basegame_type, config.freegame_type]
+    schema += [d.get_criteria() for betmode in config.bet_modes for d in betmode.get_distributions()]
+    schema += sorted({name for (_, name) in config.paytable})
+    for special_type, names in config.special_symbols.items():
+        if isinstance(special_type, str):
+            schema += [special_type] + sorted(names)
+    return list(dict.fromkeys(sys.intern(s) for s in schema))
+
+
+# Value tags. Strings of the schema are written as REF8/REF16 and their index, other strings in full.
+NONE, FALSE, TRUE, INT8, INT32, INT64, BIGINT, FLOAT, REF8, REF16, STR, LIST, DICT = range(13)
+LONG_SIZE = 255
+PACK_INT8 = struct.Struct("<Bb").pack
+PACK_INT32 = struct.Struct("<Bi").pack
+PACK_INT64 = struct.Struct("<Bq").pack
+PACK_FLOAT = struct.Struct("<Bd").pack
+PACK_SIZE = struct.Struct("<BB").pack
+PACK_LONG_SIZE = struct.Struct("<BBI").pack
+SIZE = struct.Struct("<I")
+VALUES = {
+    "b": struct.Struct("<b"),
+    "i": struct.Struct("<i"),
+    "q": struct.Struct("<q"),
+    "d": struct.Struct("<d"),
+    "H": struct.Struct("<H"),
+}
+
+
+class BookEncoder:
+    """
+    Encodes books as tagged binary values. Strings found in the schema are written as their index
+    in the schema, compared by value, so keys, event types and symbol names take one or two bytes.
+    Lists and dicts are prefixed with their size, integers and floats are written as fixed size
+    little-endian values. Records are length prefixed. Only JSON types (and tuples, written as lists)
+    are supported.
+    """
+
+    def __init__(self, schema: List[str]):
+        self.schema = list(schema)
+        self.string_refs = {
+            string: bytes([REF8, index]) if index < 256 else bytes([REF16]) + VALUES["H"].pack(index)
+            for index, string in enumerate(self.schema)
+        }
+
+    def get_header(self) -> bytes:
+        """File header: magic, then the length prefixed JSON schema."""
+        schema = json.dumps(self.schema).encode("UTF-8")
+        return BINARY_BOOKS_MAGIC + RECORD_LENGTH.pack(len(schema)) + schema
+
+    def encode(self, book: dict) -> bytes:
+        """Length prefixed record of a single book."""
+        parts = []
+        self.encode_value(book, parts.append)
+        record = b"".join(parts)
+        return RECORD_LENGTH.pack(len(record)) + record
+
+    def encode_value(self, value: object, write: callable) -> None:
+        """Append the encoding of a single value."""
+        value_type = type(value)
+        if value_type is str:
+            ref = self.string_refs.get(value)
+            if ref is not None:
+                write(ref)
+            else:
+                data = value.encode("UTF-8")
+                write(pack_size(STR, len(data)))
+                write(data)
+        elif value_type is int:
+            if -128 <= value < 128:
+                write(PACK_INT8(INT8, value))
+            elif -(2**31) <= value < 2**31:
+                write(PACK_INT32(INT32, value))
+            elif -(2**63) <= value < 2**63:
+                write(PACK_INT64(INT64, value))
+            else:
+                data = str(value).encode("UTF-8")
+                write(pack_size(BIGINT, len(data)))
+                write(data)
+        elif value_type is float:
+            write(PACK_FLOAT(FLOAT, value))
+        elif value_type is dict:
+            write(pack_size(DICT, len(value)))
+            for key, item in value.items():
+                self.encode_value(key, write)
+                self.encode_value(item, write)
+        elif value_type is list or value_type is tuple:
+            write(pack_size(LIST, len(value)))
+            for item in value:
+                self.encode_value(item, write)
+        elif value is None:
+            write(b"\x00")
+        elif value is False:
+            write(b"\x01")
+        elif value is True:
+            write(b"\x02")
+        else:
+            raise TypeError(f"Cannot encode {value_type.__name__} in a binary book.")
+
+
+def pack_size(tag: int, size: int) -> bytes:
+    """Tag followed by a size, in one byte if it is small."""
+    if size < LONG_SIZE:
+        return PACK_SIZE(tag, size)
+    return PACK_LONG_SIZE(tag, LONG_SIZE, size)
+
+
+class BookDecoder:
+    """Decodes records written by BookEncoder with the same schema. No code is run while decoding."""
+
+    def __init__(self, schema: List[str]):
+        self.schema = list(schema)
+
+    def decode(self, record: bytes) -> dict:
+        """Book of a single record (without its length prefix)."""
+        value, position = self.decode_value(memoryview(record), 0)
+        if position != len(record):
+            raise RuntimeError("Binary book record has trailing data.")
+        return value
+
+    def decode_value(self, data: memoryview, position: int) -> tuple:
+        """Value starting at position, and the position following it."""
+        tag = data[position]
+        position += 1
+        if tag == REF8:
+            return self.schema[data[position]], position + 1
+        if tag == DICT or tag == LIST or tag == STR or tag == BIGINT:
+            size = data[position]
+            position += 1
+            if size == LONG_SIZE:
+                size = SIZE.unpack_from(data, position)[0]
+                position += SIZE.size
+            if tag == DICT:
+                value = {}
+                for _ in range(size):
+                    key, position = self.decode_value(data, position)
+                    value[key], position = self.decode_value(data, position)
+                return value, position
+            if tag == LIST:
+                value = []
+                for _ in range(size):
+                    item, position = self.decode_value(data, position)
+                    value.append(item)
+                return value, position
+            text = str(data[position : position + size], "UTF-8")
+            return (text if tag == STR else int(text)), position + size
+        if tag == INT8:
+            return VALUES["b"].unpack_from(data, position)[0], position + 1
+        if tag == INT32:
+            return VALUES["i"].unpack_from(data, position)[0], position + 4
+        if tag == INT64:
+            return VALUES["q"].unpack_from(data, position)[0], position + 8
+        if tag == FLOAT:
+            return VALUES["d"].unpack_from(data, position)[0], position + 8
+        if tag == REF16:
+            return self.schema[VALUES["H"].unpack_from(data, position)[0]], position + 2
+        if tag <= TRUE:
+            return (None, False, True)[tag], position
+        raise RuntimeError(f"Unknown value tag {tag} in binary book record.")
+
+
+def write_binary_books(
+    books: Iterable[dict],
+    binary_filename: str,
+    schema: List[str],
+    compression_level: int = 3,
+    compression_threads: int = 0,
+) -> None:
+    """Write books to a binary books file, zstd compressed if the filename ends with .zst."""
+    encoder = BookEncoder(schema)
+    with open(binary_filename, "wb") as f:
+        stream = f
+        if binary_filename.endswith(".zst"):
+            compressor = zstd.ZstdCompressor(level=compression_level, threads=compression_threads)
+            stream = compressor.stream_writer(f, closefd=False)
+        stream.write(encoder.get_header())
+        for book in books:
+            stream.write(encoder.encode(book))
+        if stream is not f:
+            stream.close()
+
+
+def read_exactly(stream: io.RawIOBase, size: int) -> bytes:
+    """Read size bytes, fewer only at the end of the stream."""
+    data = stream.read(size)
+    while 0 < len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def read_binary_books(binary_filename: str) -> Iterator[dict]:
+    """Books of a (zstd compressed, if ending with .zst) binary books file, in order."""
+    with open(binary_filename, "rb") as f:
+        stream = f
+        if binary_filename.endswith(".zst"):
+            stream = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        if read_exactly(stream, len(BINARY_BOOKS_MAGIC)) != BINARY_BOOKS_MAGIC:
+            raise RuntimeError(f"{binary_filename} is not a binary books file.")
+        schema_length = RECORD_LENGTH.unpack(read_exactly(stream, RECORD_LENGTH.size))[0]
+        decoder = BookDecoder(json.loads(read_exactly(stream, schema_length)))
+        while True:
+            length = read_exactly(stream, RECORD_LENGTH.size)
+            if not length:
+                break
+            record_length = RECORD_LENGTH.unpack(length)[0]
+            record = read_exactly(stream, record_length)
+            if len(record) != record_length:
+                raise RuntimeError(f"{binary_filename} ends with an incomplete book.")
+            yield decoder.decode(record)
+
+
+def transcode_books(
+    binary_filename: str, output_filename: str, compression_level: int = 3, compression_threads: int = 0
+) -> int:
+    """
+    Stream a binary books file into JSON lines, zstd compressed with `compression_level` and
+    `compression_threads` if output_filename ends with .zst (the RGS .jsonl.zst format).
+    Returns the number of books written.
+    """
+    num_books = 0
+    with open(output_filename, "wb") as f:
+        stream = f
+        if output_filename.endswith(".zst"):
+            compressor = zstd.ZstdCompressor(level=compression_level, threads=compression_threads)
+            stream = compressor.stream_writer(f, closefd=False)
+        for book in read_binary_books(binary_filename):
+            stream.write((json.dumps(book) + "\n").encode("UTF-8"))
+            num_books += 1
+        if stream is not f:
+            stream.close()
+    return num_books
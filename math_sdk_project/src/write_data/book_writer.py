@@ -0,0 +1,120 @@
+"""Stream finished simulation books into compact per-chunk outputs."""
+
+import io
+import json
+import zstandard as zstd
+from src.write_data.book_archive import SeekableBookWriter
+from src.write_data.book_codec import BookEncoder
+
+
+class BookWriter:
+    """
+    Serializes each book as soon as a simulation is finished, writing the book, lookup table
+    and segmented lookup lines in the same pass. The output of a whole chunk is held in memory
+    until it is handed to the parent: compressed books are fed to the compressor as they are
+    written, so only the compressed chunk is kept (plus the books of one unfinished frame with
+    `books_per_frame`), while uncompressed books are kept as written, which is why uncompressed
+    chunks are capped at run_sims.MAX_UNCOMPRESSED_CHUNK_SIZE books. Compressed books form
+    finished zstd frames (one per `books_per_frame` books if given, for the seekable archive),
+    which the parent appends to the book file as they are. The chunk output is handed back to
+    the parent process and merged by write_data.ChunkMerger. With write_books=False only the
+    lookup tables are written. With a book_encoder, books are written as binary records (see
+    write_data.book_codec) rather than JSON.
+    """
+
+    def __init__(
+        self,
+        compress: bool,
+        output_regular_json: bool = False,
+        record_event_list: bool = False,
+        write_books: bool = True,
+        book_encoder: BookEncoder = None,
+        compression_level: int = 3,
+        compression_threads: int = 0,
+        books_per_frame: int = None,
+    ):
+        self.compress = compress
+        self.write_books = write_books
+        self.book_encoder = book_encoder
+        self.regular_json = output_regular_json and not self.compress and book_encoder is None
+        self.num_books = 0
+        self.book_ids = []
+        self.event_items = {} if record_event_list else None
+        self.archive = None
+
+        if self.compress:
+            self.books_buffer = io.BytesIO()
+            compressor = zstd.ZstdCompressor(level=compression_level, threads=compression_threads)
+            if books_per_frame:
+                self.archive = SeekableBookWriter(self.books_buffer, books_per_frame, compressor)
+            else:
+                self.books_stream = compressor.stream_writer(self.books_buffer, closefd=False)
+        elif self.book_encoder is not None:
+            self.books_buffer = io.BytesIO()
+            self.books_stream = self.books_buffer
+        else:
+            self.books_buffer = io.StringIO()
+            self.books_stream = self.books_buffer
+        self.lookup_buffer = io.StringIO()
+        self.segmented_buffer = io.StringIO()
+
+    def write_book(self, book: dict) -> None:
+        """Write a JSON-ready book and its lookup table entries."""
+        if self.write_books:
+            self.write_book_line(book)
+
+        self.lookup_buffer.write("{},1,{}\n".format(book["id"], book["payoutMultiplier"]))
+        self.segmented_buffer.write(
+            str(book["id"])
+            + ","
+            + str(book["criteria"])
+            + ","
+            + str(round(book["baseGameWins"], 2))
+            + ","
+            + str(round(book["freeGameWins"], 2))
+            + "\n"
+        )
+        if self.event_items is not None:
+            update_unique_events(self.event_items, book)
+        self.book_ids.append(book["id"])
+        self.num_books += 1
+
+    def write_book_line(self, book: dict) -> None:
+        """Serialize the book itself in the output books format."""
+        if self.book_encoder is not None:
+            self.books_stream.write(self.book_encoder.encode(book))
+        elif self.archive is not None:
+            self.archive.add_book((json.dumps(book) + "\n").encode("UTF-8"), book["id"])
+        elif self.compress:
+            self.books_stream.write((json.dumps(book) + "\n").encode("UTF-8"))
+        elif self.regular_json:
+            self.books_stream.write((", " if self.num_books > 0 else "") + json.dumps(book))
+        else:
+            self.books_stream.write(json.dumps(book) + "\n")
+
+    def close(self) -> dict:
+        """Finish the compressed frames and return everything written for this chunk."""
+        if self.archive is not None:
+            self.archive.close()
+        elif self.compress:
+            self.books_stream.close()
+        chunk_output = {
+            "books": self.books_buffer.getvalue(),
+            "lookup": self.lookup_buffer.getvalue(),
+            "segmented": self.segmented_buffer.getvalue(),
+            "event_items": self.event_items,
+            "num_books": self.num_books,
+            "book_ids": self.book_ids,
+        }
+        if self.archive is not None:
+            chunk_output["frame_offsets"] = self.archive.frame_offsets
+            chunk_output["line_offsets"] = self.archive.line_offsets
+        return chunk_output
+
+
+def update_unique_events(event_items: dict, book: dict) -> None:
+    """Keep the first example of every event type seen in a book."""
+    for instance in book["events"]:
+        lib_event = instance["type"]
+        if lib_event not in event_items:
+            event_items[lib_event] = {key: instance[key] for key in instance.keys() if key != "index"}
@@ -5,9 +5,12 @@ from warnings import warn
 import shutil
 import os
 import hashlib
+import io
 import json
-import ast
 import zstandard as zstd
+from src.write_data.book_writer import update_unique_events
+from src.write_data.book_archive import SeekableBookWriter, train_book_dictionary
+from src.write_data.book_codec import BookEncoder, get_book_schema, transcode_books
 
 
 def get_sha_256(file_to_hash: str):
@@ -105,16 +108,14 @@ def make_lookup_pay_split(gamestate: object, name: str):
 
 def write_library_events(gamestate: object, library: list, gametype: str):
     """Write all unique events within a given mode - with one example application."""
-    unique_event = []
     event_items = {}
     for event in library:
-        for instance in event["events"]:
-            lib_event = instance["type"]
-            if lib_event not in unique_event:
-                unique_event.append(lib_event)
-                item_keys = instance.keys()
-                dict_details = {key: instance[key] for key in item_keys if key != "index"}
-                event_items[lib_event] = dict_details
+        update_unique_events(event_items, event)
+    write_event_items(gamestate, event_items, gametype)
+
+
+def write_event_items(gamestate: object, event_items: dict, gametype: str):
+    """Write unique event examples collected while simulating."""
     json_object = json.dumps(event_items, indent=4)
     with open(
         os.path.join(gamestate.output_files.config_path, f"event_config_{gametype}.json"),
@@ -124,77 +125,231 @@ def write_library_events(gamestate: object, library: list, gametype: str):
         f.write(json_object)
 
 
-def output_lookup_and_force_files(
-    threads: int,
-    batching_size: int,
-    game_id: str,
-    betmode: str,
-    gamestate: object,
-    num_sims: int = 1000000,
-    compress: bool = True,
-):
-    """Combine temporary lookup tables and force files into a single output."""
-    print("Saving books for ", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
-    file_list = []
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
-            file_list.append(
-                gamestate.output_files.get_temp_multi_thread_name(betmode, thread, repeat_index, compress)
-            )
-
-    if compress:
-        temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
-        with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
-            for fname in file_list:
-                with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
-                    outfile.write(decompressed.decode("UTF-8"))
+DICTIONARY_SAMPLE_BOOKS = 2000
+
+
+class ChunkMerger:
+    """
+    Merge chunk outputs returned by the simulation workers directly into the final book, lookup
+    and force files. Chunks may arrive in any order; each is written as soon as all earlier chunks
+    have been written, so the output is always in simulation order and nothing is staged on disk.
+    Workers compress their books into finished zstd frames, which are appended without being
+    decompressed.
+
+    If `books_per_frame` is given, compressed books are written as a seekable archive of
+    independent frames, along with a book id index readable by book_archive.BookArchiveReader.
+    With `stats_only`, no books are written, only the lookup tables and force files.
+    With `binary_books`, chunks hold binary book records which are written to the intermediate
+    binary books file, then published as the final .jsonl.zst books once all chunks are written
+    (see publish_binary_books()).
+
+    Book files are compressed with `compression_level` and `compression_threads` zstd worker threads,
+    by each simulation worker and for the files written here.
+    With `dictionary_size` (and `books_per_frame`), a zstd dictionary of that many bytes is trained
+    on the first DICTIONARY_SAMPLE_BOOKS books and used to compress a second archive of the same
+    books in the books folder, with its own index. The dictionary is saved next to it and is required
+    to read it. The published books never use the dictionary.
+    """
+
+    def __init__(
+        self,
+        gamestate: object,
+        game_id: str,
+        betmode: str,
+        compress: bool = True,
+        books_per_frame: int = None,
+        stats_only: bool = False,
+        binary_books: bool = False,
+        compression_level: int = 3,
+        compression_threads: int = 0,
+        dictionary_size: int = None,
+    ):
+        print("Saving books for", game_id, "in", betmode)
+        self.gamestate = gamestate
+        self.betmode = betmode
+        self.compress = compress
+        self.binary_books = binary_books
+        self.regular_json = gamestate.config.output_regular_json and not compress and not binary_books
+        self.next_chunk = 0
+        self.pending_chunks = {}
+        self.num_books = 0
+        self.force_results = {}
+        self.event_items = {}
+        self.archive = None
+        self.write_books = not stats_only
+        self.compression_level = compression_level
+        self.compression_threads = compression_threads
+        self.dictionary_size = dictionary_size
+        self.dictionary_samples = None
+        self.dictionary_archive = None
+
+        output_files = gamestate.output_files
+        if self.write_books:
+            self.open_books(books_per_frame)
+        self.lookup_file = open(output_files.get_final_lookup_name(betmode), "w", encoding="UTF-8")
+        self.segmented_file = open(output_files.get_final_segmented_name(betmode), "w", encoding="UTF-8")
+
+    def get_compressor(self, dictionary: zstd.ZstdCompressionDict = None) -> zstd.ZstdCompressor:
+        """Compressor for the book file, with the requested level and threads."""
+        return zstd.ZstdCompressor(
+            level=self.compression_level, threads=self.compression_threads, dict_data=dictionary
+        )
 
-        final_out = gamestate.output_files.get_final_book_name(betmode, True)
-        with open(temp_book_output_path, "rb") as f_in, open(final_out, "wb") as f_out:
-            f_out.write(zstd.ZstdCompressor().compress(f_in.read()))
+    def open_books(self, books_per_frame: int = None) -> None:
+        """Open the final book file in the requested format."""
+        output_files = self.gamestate.output_files
+        # Indexes and dictionary archives of an earlier run would no longer match the new books
+        stale_filenames = [
+            output_files.get_book_dictionary_name(self.betmode),
+            output_files.get_dictionary_archive_name(self.betmode),
+            output_files.get_dictionary_archive_index_name(self.betmode),
+        ]
+        if not (books_per_frame and self.compress and not self.binary_books):
+            stale_filenames.append(output_files.get_book_index_name(self.betmode))
+        for filename in stale_filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+        if self.binary_books:
+            # Published books of an earlier run would no longer match the new lookup tables
+            if os.path.exists(output_files.get_final_book_name(self.betmode, True)):
+                os.remove(output_files.get_final_book_name(self.betmode, True))
+            self.books_file = open(output_files.get_binary_book_name(self.betmode, self.compress), "wb")
+            header = BookEncoder(get_book_schema(self.gamestate.config)).get_header()
+            self.books_file.write(self.get_compressor().compress(header) if self.compress else header)
+        elif self.compress:
+            self.books_file = open(output_files.get_final_book_name(self.betmode, True), "wb")
+            if books_per_frame:
+                self.archive = SeekableBookWriter(self.books_file, books_per_frame, self.get_compressor())
+                if self.dictionary_size:
+                    self.dictionary_samples = []
+        else:
+            self.books_file = open(output_files.get_final_book_name(self.betmode, False), "w", encoding="UTF-8")
+            self.books_stream = self.books_file
+            if self.regular_json:
+                self.books_stream.write("[")
+
+    def add_chunk(self, chunk_output: dict) -> None:
+        """Queue a finished chunk and write every chunk that is now next in line."""
+        self.pending_chunks[chunk_output["chunk_index"]] = chunk_output
+        while self.next_chunk in self.pending_chunks:
+            self.write_chunk(self.pending_chunks.pop(self.next_chunk))
+            self.next_chunk += 1
+
+    def write_chunk(self, chunk_output: dict) -> None:
+        """Append a single chunk to the output streams."""
+        if self.write_books:
+            self.write_chunk_books(chunk_output)
+        self.num_books += chunk_output["num_books"]
+
+        self.lookup_file.write(chunk_output["lookup"])
+        self.segmented_file.write(chunk_output["segmented"])
+
+        for key, record in chunk_output["recorded_events"].items():
+            if key in self.force_results:
+                self.force_results[key]["timesTriggered"] += record["timesTriggered"]
+                self.force_results[key]["bookIds"] += record["bookIds"]
+            else:
+                self.force_results[key] = record
+
+        for event_type, example in (chunk_output["event_items"] or {}).items():
+            self.event_items.setdefault(event_type, example)
+
+    def write_chunk_books(self, chunk_output: dict) -> None:
+        """Append the books of a single chunk to the book file."""
+        if self.archive is not None:
+            self.archive.write_frames(
+                chunk_output["books"],
+                chunk_output["frame_offsets"],
+                chunk_output["book_ids"],
+                chunk_output["line_offsets"],
+            )
+            if self.dictionary_samples is not None or self.dictionary_archive is not None:
+                book_lines = (
+                    zstd.ZstdDecompressor()
+                    .stream_reader(io.BytesIO(chunk_output["books"]), read_across_frames=True)
+                    .read()
+                )
+                self.write_dictionary_books(book_lines, chunk_output["book_ids"])
+        elif self.compress or self.binary_books:
+            self.books_file.write(chunk_output["books"])
+        elif self.regular_json and self.num_books > 0 and chunk_output["num_books"] > 0:
+            self.books_stream.write(", " + chunk_output["books"])
+        else:
+            self.books_stream.write(chunk_output["books"])
+
+    def write_dictionary_books(self, book_lines: bytes, book_ids: list) -> None:
+        """Append books to the dictionary archive, holding them back until the dictionary is trained."""
+        if self.dictionary_archive is not None:
+            self.dictionary_archive.write_books(book_lines, book_ids)
+            return
+        self.dictionary_samples.append((book_lines, book_ids))
+        if sum(len(sample_ids) for _, sample_ids in self.dictionary_samples) >= DICTIONARY_SAMPLE_BOOKS:
+            self.start_dictionary_archive()
+
+    def start_dictionary_archive(self) -> None:
+        """Train the frame dictionary on the books held back so far, then write them to the dictionary archive."""
+        samples, self.dictionary_samples = self.dictionary_samples, None
+        book_lines = [line for lines, _ in samples for line in lines.splitlines(keepends=True)]
+        dictionary = train_book_dictionary(book_lines, self.dictionary_size)
+        if dictionary is None:
+            warn(f"Could not train a dictionary on {len(book_lines)} {self.betmode} books, no dictionary archive is written.")
+            return
+        output_files = self.gamestate.output_files
+        with open(output_files.get_book_dictionary_name(self.betmode), "wb") as f:
+            f.write(dictionary.as_bytes())
+        self.dictionary_file = open(output_files.get_dictionary_archive_name(self.betmode), "wb")
+        self.dictionary_archive = SeekableBookWriter(
+            self.dictionary_file, self.archive.books_per_frame, self.get_compressor(dictionary)
+        )
+        for lines, book_ids in samples:
+            self.dictionary_archive.write_books(lines, book_ids)
+
+    def close_books(self) -> None:
+        """Finish the book file, and the archive index if there is one."""
+        if self.dictionary_samples is not None:
+            self.start_dictionary_archive()
+        if self.dictionary_archive is not None:
+            self.dictionary_archive.close()
+            self.dictionary_file.close()
+            self.dictionary_archive.write_index(
+                self.gamestate.output_files.get_dictionary_archive_index_name(self.betmode)
+            )
+        if self.regular_json:
+            self.books_stream.write("]")
+        self.books_file.close()
+        if self.archive is not None:
+            self.archive.write_index(self.gamestate.output_files.get_book_index_name(self.betmode))
+        if self.binary_books:
+            print("Publishing binary books for", self.gamestate.config.game_id, "in", self.betmode)
+            publish_binary_books(
+                self.gamestate, self.betmode, self.compress, self.compression_level, self.compression_threads
+            )
 
-        os.remove(temp_book_output_path)
-    else:
-        with open(
-            gamestate.output_files.get_final_book_name(betmode, False),
-            "w",
-            encoding="UTF-8",
-        ) as outfile:
-            for id, filename in enumerate(file_list):
-                with open(filename, "r", encoding="UTF-8") as infile:
-                    file_data = infile.read()
-                    if filename.endswith(".jsonl"):
-                        outfile.write(file_data)
-                    elif filename.endswith(".json"):
-                        if id == 0 and len(file_list) == 1:
-                            outfile.write(file_data)
-                        elif id == 0 and len(file_list) > 1:
-                            outfile.write(file_data[:-1])  # don't write final ']'
-                        elif id != len(file_list) - 1:
-                            outfile.write("," + file_data[1:-1])  # don't write first or last '[/]'
-                        else:
-                            outfile.write("," + file_data[1::])  # dont write first '[', write last ']'
-
-    print("Saving force files for", game_id, "in", betmode)
-    force_results_dict = {}
-    file_list = []
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
-            file_list.append(
-                gamestate.output_files.get_temp_force_name(betmode, thread, repeat_index),
+    def close(self, write_event_list: bool = False) -> None:
+        """Finish all output files once every chunk has been added."""
+        if len(self.pending_chunks) > 0:
+            raise RuntimeError(f"Chunk {self.next_chunk} was never added, could not write {self.betmode} books.")
+        if self.write_books:
+            self.close_books()
+        self.lookup_file.close()
+        self.segmented_file.close()
+
+        print("Saving force files for", self.gamestate.config.game_id, "in", self.betmode)
+        write_force_files(self.gamestate, self.betmode, self.force_results)
+        if write_event_list and self.write_books:
+            write_event_items(self.gamestate, self.event_items, self.betmode)
+
+        # Write _0 file if it does not exist
+        output_files = self.gamestate.output_files
+        if not (os.path.exists(output_files.get_optimized_lookup_name(self.betmode))):
+            shutil.copy(
+                output_files.get_final_lookup_name(self.betmode),
+                output_files.get_optimized_lookup_name(self.betmode),
             )
 
-    for filename in file_list:
-        force_chunk = ast.literal_eval(json.load(open(filename, "r", encoding="UTF-8")))
-        for key in force_chunk:
-            if force_results_dict.get(key) is not None:
-                force_results_dict[key]["timesTriggered"] += force_chunk[key]["timesTriggered"]
-                force_results_dict[key]["bookIds"] += force_chunk[key]["bookIds"]
-            else:
-                force_results_dict[key] = force_chunk[key]
 
+def write_force_files(gamestate: object, betmode: str, force_results_dict: dict):
+    """Write the force record for a bet mode and add its unique keys to force.json."""
     force_results_dict_just_for_rob = []
     for force_combination in force_results_dict:
         search_dict = []
@@ -219,70 +374,27 @@ def output_lookup_and_force_files(
             data = json.load(file)
     except FileNotFoundError:
         data = {}
-    data[gamestate.get_current_betmode().get_name()] = forceResultKeys
+    data[betmode] = forceResultKeys
     json_object = json.dumps(data, indent=4)
     with open(json_file_path, "w", encoding="UTF-8") as file:
         file.write(json_object)
 
-    weights_plus_wins_file_list = []
-    segmented_lut_file_list = []
-    print("Saving LUTs for", game_id, "in", betmode)
-    for repeat_index in range(num_repeats):
-        for thread in range(threads):
-            weights_plus_wins_file_list += [
-                gamestate.output_files.get_temp_lookup_name(betmode, thread, repeat_index)
-            ]
-            segmented_lut_file_list += [
-                gamestate.output_files.get_temp_segmented_name(betmode, thread, repeat_index)
-            ]
-
-    with open(
-        gamestate.output_files.get_final_lookup_name(betmode),
-        "w",
-        encoding="UTF-8",
-    ) as outfile:
-        for filename in weights_plus_wins_file_list:
-            with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
-
-    # Write _0 file if it does not exist
-    if not (os.path.exists(gamestate.output_files.get_optimized_lookup_name(betmode))):
-        shutil.copy(
-            gamestate.output_files.get_final_lookup_name(betmode),
-            gamestate.output_files.get_optimized_lookup_name(betmode),
-        )
-    with open(
-        gamestate.output_files.get_final_segmented_name(betmode),
-        "w",
-        encoding="UTF-8",
-    ) as outfile:
-        for filename in segmented_lut_file_list:
-            with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
-
-
-def write_json(gamestate, filename: str):
-    """Convert the list of dictionaries to a JSON-encoded string and compress it in chunks."""
-    json_objects = [json.dumps(item) for item in gamestate.library.values()]
-    combined_data = "\n".join(json_objects) + "\n"
-
-    if filename.endswith(".zst"):
-        compressor = zstd.ZstdCompressor()
-        compressed_data = compressor.compress(combined_data.encode("UTF-8"))
-        with open(filename, "wb") as f:
-            f.write(compressed_data)
-    else:
-        with open(filename, "w", encoding="UTF-8") as f:
-            if not (gamestate.config.output_regular_json):
-                f.write(combined_data)
-            else:
-                j_regular = [item for item in gamestate.library.values()]
-                f.write(json.dumps(j_regular))
 
+def publish_binary_books(
+    gamestate: object,
+    betmode: str,
+    compress: bool = True,
+    compression_level: int = 3,
+    compression_threads: int = 0,
+) -> int:
+    """Transcode the intermediate binary books of a bet mode (written with create_books(binary_books=True))
+    into the final .jsonl.zst books file. Returns the number of books. create_books() publishes the books
+    of every bet mode it simulated, this republishes them from the intermediate file."""
+    output_files = gamestate.output_files
+    return transcode_books(
+        output_files.get_binary_book_name(betmode, compress),
+        output_files.get_final_book_name(betmode, True),
+        compression_level,
+        compression_threads,
+    )
 
-def print_recorded_wins(gamestate: object, name: str = ""):
-    """Temporary file generation for wins/recorded results."""
-    json_object = json.dumps(str(gamestate.recorded_events), indent=4)
-    file = open(name, "w", encoding="UTF-8")
-    file.write(json_object)
-    file.close()
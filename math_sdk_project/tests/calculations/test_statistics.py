@@ -0,0 +1,31 @@
+"""Test weighted outcome sampling."""
+
+import random
+from src.calculations.statistics import DistributionSampler, cache_samplers, get_random_outcome, get_sampler
+
+
+def linear_outcomes(distribution: dict, draws: int) -> list:
+    """Outcomes of get_random_outcome() without a cached sampler."""
+    random.seed(42)
+    return [get_random_outcome(distribution) for _ in range(draws)]
+
+
+def test_exact_sampler_matches_linear_search():
+    """The same RNG stream gives the same outcomes as the uncached linear search."""
+    distribution = {2: 100, 3: 0.1, 5: 20.3, 10: 7, 50: 1e-3}
+    expected = linear_outcomes(dict(distribution), 2000)
+
+    conditions = {"mult_values": {"basegame": distribution}, "force_wincap": False}
+    cache_samplers(conditions)
+    assert get_sampler(distribution) is not None
+    assert linear_outcomes(distribution, 2000) == expected
+
+
+def test_alias_sampler_frequencies():
+    """Alias table draws follow the distribution weights."""
+    distribution = {"BR0": 1, "FR0": 3, "WCAP": 6}
+    sampler = DistributionSampler(distribution, exact_rng=False)
+    random.seed(7)
+    draws = [sampler.sample() for _ in range(20000)]
+    for value, weight in distribution.items():
+        assert abs(draws.count(value) / len(draws) - weight / 10) < 0.02
@@ -0,0 +1,99 @@
+"""Test symbol creation from prototypes."""
+
+import json
+import os
+import pickle
+import subprocess
+import sys
+import pytest
+from src.calculations.symbol import SymbolStorage
+from src.events.events import json_ready_sym
+
+
+class GameSymbolConfig:
+    """Paytable and special symbols used for symbol creation."""
+
+    def __init__(self):
+        self.paytable = {(3, "H1"): 10, (4, "H1"): 20, (3, "W"): 50}
+        self.special_symbols = {"wild": ["W"], "multiplier": ["W"], "scatter": ["S"]}
+
+
+@pytest.fixture
+def storage():
+    return SymbolStorage(GameSymbolConfig(), ["H1", "W", "S"])
+
+
+def test_symbol_properties(storage):
+    """Special properties and paytable details are copied from the prototype."""
+    wild = storage.create_symbol_state("W")
+    assert wild.special and wild.check_attribute("wild") and wild.check_attribute("multiplier")
+    assert wild.is_paying and wild.paytable == [{"3": 50}]
+
+    scatter = storage.create_symbol_state("S")
+    assert scatter.special and not scatter.is_paying and scatter.paytable is None
+    assert not storage.create_symbol_state("H1").special
+
+
+def test_assigned_attributes_are_per_instance(storage):
+    """Attributes assigned to a created symbol do not leak to the prototype or other symbols."""
+    first, second = storage.create_symbol_state("H1"), storage.create_symbol_state("H1")
+    first.assign_attribute({"multiplier": 3})
+    first.explode = True
+
+    assert first.get_attribute("multiplier") == 3 and first.check_attribute("explode")
+    assert not second.check_attribute("multiplier", "explode")
+    assert not storage.symbols["H1"].check_attribute("multiplier", "explode")
+
+
+def test_attribute_flags(storage):
+    """check_attribute is True for special properties and assigned values, but not for False."""
+    wild = storage.create_symbol_state("W")
+    wild.assign_attribute({"multiplier": 0, "wild": False})
+    assert wild.check_attribute("multiplier")
+    assert not wild.check_attribute("wild")
+    assert wild.get_attribute("wild") is False and wild.multiplier == 0
+    assert not hasattr(wild, "prize")
+
+
+def test_json_ready_sym_order(storage):
+    """Special properties are listed first, assigned attributes keep their assignment order."""
+    wild = storage.create_symbol_state("W")
+    wild.assign_attribute({"prize": 5, "multiplier": 3})
+    wild.explode = True
+
+    json_sym = json_ready_sym(wild, ["wild", "multiplier", "scatter", "prize"])
+    assert list(json_sym.items()) == [("name", "W"), ("wild", True), ("multiplier", 3), ("prize", 5)]
+
+
+CHILD_CHECK = """
+import json, pickle, sys
+from src.calculations.symbol import get_attribute_bit
+
+# A fresh process allocates attribute bits in its own order
+get_attribute_bit("prize")
+get_attribute_bit("explode")
+with open(sys.argv[1], "rb") as f:
+    board = pickle.load(f)
+print(json.dumps([[sym.name, [sym.check_attribute(a) for a in sys.argv[2:]]] for reel in board for sym in reel]))
+"""
+
+
+def test_flags_survive_pickling_into_new_process(storage, tmp_path):
+    """Symbols pickled into a fresh interpreter (spawned workers) keep their special properties and attributes."""
+    board = [[storage.create_symbol_state(name) for name in ["W", "H1", "S"]] for _ in range(2)]
+    board[1][1].assign_attribute({"multiplier": 2})
+    board[0][0].assign_attribute({"wild": False})
+    with open(tmp_path / "board.pkl", "wb") as f:
+        pickle.dump(board, f)
+
+    attributes = ["wild", "scatter", "multiplier", "explode"]
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_CHECK, str(tmp_path / "board.pkl")] + attributes,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    expected = [[sym.name, [sym.check_attribute(a) for a in attributes]] for reel in board for sym in reel]
+    assert json.loads(result.stdout) == expected
+    assert expected[1] == ["H1", [False, False, False, False]] and expected[4] == ["H1", [False, False, True, False]]
@@ -0,0 +1,88 @@
+"""Test tumbling winning symbols off the board."""
+
+import pytest
+from src.calculations.tumble import Tumble
+
+
+class GameTumbleConfig:
+    """Two reel board with a single reelstrip."""
+
+    def __init__(self, include_padding: bool):
+        self.num_reels = 2
+        self.num_rows = [3] * self.num_reels
+        self.paytable = {(3, "H1"): 10, (3, "L1"): 5}
+        self.special_symbols = {"wild": ["W"], "scatter": ["S"]}
+        self.reels = {"BR0": [["H1", "L1", "S", "W", "L1", "H1"], ["L1", "S", "H1", "L1", "W", "H1"]]}
+        self.include_padding = include_padding
+
+
+class TumbleTest(Tumble):
+    """Board at stop positions (2, 0) of BR0."""
+
+    def __init__(self, config):
+        self.config = config
+        self.create_symbol_map()
+        self.assign_special_sym_function()
+        self.reelstrip = config.reels["BR0"]
+        self.reel_positions = [2, 0]
+        self.board = [
+            [self.create_symbol(name) for name in ["S", "W", "L1"]],
+            [self.create_symbol(name) for name in ["L1", "S", "H1"]],
+        ]
+        self.top_symbols = [self.create_symbol("L1"), self.create_symbol("H1")]
+        self.get_special_symbols_on_board()
+
+    def assign_special_sym_function(self):
+        self.special_symbol_functions = {}
+
+    def run_spin(self, sim):
+        pass
+
+    def run_freespin(self):
+        pass
+
+
+def names(symbols):
+    return [sym.name for sym in symbols]
+
+
+@pytest.mark.parametrize("include_padding", [True, False])
+def test_tumble_board(include_padding):
+    """Exploded symbols are replaced from the reelstrip above the board, wrapping around its start."""
+    gamestate = TumbleTest(GameTumbleConfig(include_padding))
+    previous_top = gamestate.top_symbols[1]
+    gamestate.board[0][2].explode = True
+    gamestate.board[1][0].explode = True
+    gamestate.board[1][2].explode = True
+    gamestate.tumble_board()
+
+    assert gamestate.reel_positions == [1, 4]
+    assert names(gamestate.board[0]) == ["L1", "S", "W"]
+    assert names(gamestate.board[1]) == ["W", "H1", "S"]
+    assert gamestate.special_syms_on_board == {
+        "wild": [{"reel": 0, "row": 2}, {"reel": 1, "row": 0}],
+        "scatter": [{"reel": 0, "row": 1}, {"reel": 1, "row": 2}],
+    }
+    if include_padding:
+        assert gamestate.board[1][1] is previous_top
+        assert names(gamestate.top_symbols) == ["H1", "L1"]
+        assert [names(new) for new in gamestate.new_symbols_from_tumble] == [["H1"], ["L1", "W"]]
+    else:
+        assert [names(new) for new in gamestate.new_symbols_from_tumble] == [["L1"], ["W", "H1"]]
+
+
+def test_special_symbol_overrides():
+    """Placing symbols updates special symbol positions and counts for the overridden cells only."""
+    gamestate = TumbleTest(GameTumbleConfig(include_padding=True))
+    assert gamestate.count_special_symbols("scatter") == 2
+    gamestate.set_board_symbol(0, 0, gamestate.create_symbol("W"))
+    gamestate.set_board_symbol(1, 2, gamestate.create_symbol("W"))
+
+    assert gamestate.count_special_symbols("scatter") == 1
+    assert gamestate.count_special_symbols("wild") == 3
+    assert gamestate.special_syms_on_board["wild"] == [
+        {"reel": 0, "row": 0},
+        {"reel": 0, "row": 1},
+        {"reel": 1, "row": 2},
+    ]
+    assert gamestate.special_syms_on_board["scatter"] == [{"reel": 1, "row": 1}]
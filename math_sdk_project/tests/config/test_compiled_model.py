@@ -0,0 +1,101 @@
+"""Test compilation of game configuration into integer arrays."""
+
+import pytest
+from src.config import compiled_model
+from src.config.compiled_model import CompiledGameModel, get_compiled_model
+
+
+class GameModelConfig:
+    """Small lines game with a wild/multiplier and scatter symbol."""
+
+    def __init__(self):
+        self.num_reels = 3
+        self.num_rows = [3] * self.num_reels
+        self.paytable = {
+            (3, "W"): 20,
+            (3, "H1"): 10,
+            (2, "H1"): 2,
+            (3, "L1"): 1,
+        }
+        self.paylines = {1: [0, 0, 0], 2: [0, 1, 2]}
+        self.special_symbols = {"wild": ["W", "WM"], "scatter": ["S"], "multiplier": ["WM"]}
+        self.reels = {"BR0": [["H1", "L1", "S"], ["W", "L1", "H1", "L1"], ["WM", "S", "H1"]]}
+
+
+@pytest.fixture
+def model():
+    return CompiledGameModel(GameModelConfig())
+
+
+def test_symbol_ids_and_paytable(model):
+    """Symbols are numbered by name and the pay array is indexed by [symbol, kind]."""
+    assert model.symbol_names == ["H1", "L1", "S", "W", "WM"]
+    assert model.pay_array[model.symbol_ids["H1"], 2] == 2
+    assert model.pay_array[model.symbol_ids["W"], 3] == 20
+    assert list(model.is_paying) == [True, True, False, True, False]
+
+
+def test_reels_paylines_and_masks(model):
+    """Reelstrips and paylines become index arrays, special types become bitmasks."""
+    assert [model.symbol_names[s] for s in model.reel_ids["BR0"][1]] == ["W", "L1", "H1", "L1"]
+    assert model.paylines.tolist() == [[0, 0, 0], [0, 1, 2]]
+    wild_mask = model.get_symbol_mask("wild")
+    assert [name for name, is_wild in zip(model.symbol_names, wild_mask) if is_wild] == ["W", "WM"]
+    assert model.symbol_flags[model.symbol_ids["WM"]] == model.get_special_mask("wild", "multiplier")
+
+
+def test_compiled_once_per_config():
+    """The same config object always returns the same compiled model."""
+    config = GameModelConfig()
+    assert get_compiled_model(config) is get_compiled_model(config)
+
+
+def test_reel_windows(model):
+    """Windows wrap around the reelstrip and record padding and special symbols."""
+    window = model.get_reel_window("BR0", 1, 2)
+    assert window.symbols == ("H1", "L1", "W")
+    assert (window.top, window.bottom) == ("L1", "L1")
+    assert window.special_rows == (2,)
+    assert window.special_counts == (1, 0, 0)
+    assert window.padding_position == 2
+    assert model.get_reel_window("BR0", 1, -2) == window
+
+    window = model.get_reel_window("BR0", 2, 0)
+    assert window.special_rows == (0, 1)
+    assert window.special_counts == (1, 1, 1)
+    assert window.special_mask == model.get_special_mask("wild", "scatter", "multiplier")
+
+
+def test_stops_by_count(model):
+    """Stops are grouped by the number of target symbols in their window, by type or by name."""
+    scatter_stops = model.get_stops_by_count("BR0", "scatter")
+    assert scatter_stops[0] == {1: [0, 1, 2]}
+    assert scatter_stops[1] == {0: [0, 1, 2, 3]}
+    assert scatter_stops[2] == {1: [0, 1, 2]}
+
+    wild_stops = model.get_stops_by_count("BR0", "wild")
+    assert wild_stops[1] == {0: [1], 1: [0, 2, 3]}
+    assert model.get_stops_by_count("BR0", "l1")[1] == {1: [0, 2], 2: [1, 3]}
+    assert model.get_stops_by_count("BR0", "wild") is wild_stops
+
+
+def test_payline_trie(model):
+    """Paylines sharing a first row share a trie node listing both lines."""
+    assert [node.row for node in model.payline_trie] == [0]
+    root = model.payline_trie[0]
+    assert root.lines == [1, 2]
+    assert [(child.reel, child.row, child.lines) for child in root.children] == [(1, 0, [1]), (1, 1, [2])]
+
+
+def test_reel_columns(model, monkeypatch):
+    """Client columns match json_ready_sym and only the most recently used columns are kept."""
+    column = model.get_reel_column("BR0", 2, 0, include_padding=True)
+    assert column.symbols == ("H1", "WM", "S", "H1", "WM")
+    assert column.json_symbols[1] == {"name": "WM", "wild": True, "multiplier": True}
+    assert column.json_symbols[2] == {"name": "S", "scatter": True}
+    assert model.get_reel_column("BR0", 2, 0, include_padding=True) is column
+    assert model.get_reel_column("BR0", 2, 0, include_padding=False).symbols == ("WM", "S", "H1")
+
+    monkeypatch.setattr(compiled_model, "REEL_COLUMN_CACHE_SIZE", 2)
+    model.get_reel_column("BR0", 0, 1, include_padding=True)
+    assert list(model.reel_columns) == [("BR0", 2, 0, False), ("BR0", 0, 1, True)]
@@ -0,0 +1,52 @@
+"""Sample games run through create_books, with the library written to a temporary folder."""
+
+import os
+import io
+import sys
+import json
+import importlib
+import zstandard as zstd
+from src.config.paths import PATH_TO_GAMES
+
+GAME_MODULES = [
+    "gamestate",
+    "game_config",
+    "game_override",
+    "game_executables",
+    "game_calculations",
+    "game_events",
+    "game_optimization",
+]
+
+
+def load_sample_game(game_id: str, tmp_path, monkeypatch) -> object:
+    """GameState of a sample game in the games folder. Output files are written to tmp_path/<game_id>/library."""
+    monkeypatch.setattr("src.config.output_filenames.PATH_TO_GAMES", str(tmp_path))
+    monkeypatch.syspath_prepend(os.path.join(PATH_TO_GAMES, game_id))
+    # Every sample game has modules of the same names
+    for module in GAME_MODULES:
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    config = importlib.import_module("game_config").GameConfig()
+    return importlib.import_module("gamestate").GameState(config)
+
+
+def read_library(gamestate: object, folders: list = ("books", "forces", "lookup_tables", "publish_files")) -> dict:
+    """Contents of the output files in the given library folders, by path relative to the library.
+    Compressed files are decompressed and force.json keys are sorted, as their order depends on arrival."""
+    library_path = gamestate.output_files.library_path
+    contents = {}
+    for folder in folders:
+        for dirpath, _, filenames in os.walk(os.path.join(library_path, folder)):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename), "rb") as f:
+                    data = f.read()
+                if filename.endswith(".zst"):
+                    data = zstd.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+                if filename == "force.json":
+                    force_keys = json.loads(data)
+                    data = {
+                        mode: {key: sorted(map(str, values)) for key, values in keys.items()}
+                        for mode, keys in force_keys.items()
+                    }
+                contents[os.path.relpath(os.path.join(dirpath, filename), library_path)] = data
+    return contents
@@ -0,0 +1,85 @@
+"""Simulation scheduling and output of create_books."""
+
+import os
+from src.state.run_sims import (
+    MAX_UNCOMPRESSED_CHUNK_SIZE,
+    create_books,
+    get_chunk_size,
+    get_sim_chunks,
+    order_chunks_by_cost,
+)
+from tests.state.sample_game import load_sample_game, read_library
+
+
+def test_get_sim_chunks():
+    """Chunks cover every simulation once, the last chunk holding the remainder."""
+    assert get_sim_chunks(10, 4) == [(0, 4), (4, 4), (8, 2)]
+    assert get_sim_chunks(8, 4) == [(0, 4), (4, 4)]
+    assert get_sim_chunks(3, 10) == [(0, 3)]
+    assert get_sim_chunks(3, 1) == [(0, 1), (1, 1), (2, 1)]
+    assert get_sim_chunks(0, 5) == []
+
+
+def test_get_chunk_size():
+    """Uncompressed chunks are capped, compressed chunks are rounded up to whole frames."""
+    assert get_chunk_size(int(1e5), 2, 5000, True) == 2500
+    assert get_chunk_size(int(1e5), 2, 5000, True, chunk_size=50000) == 50000
+    assert get_chunk_size(int(1e5), 2, 5000, False, chunk_size=50000) == MAX_UNCOMPRESSED_CHUNK_SIZE
+    assert get_chunk_size(int(1e5), 2, 5000, True, chunk_size=130, books_per_frame=100) == 200
+
+
+def test_order_chunks_by_cost():
+    """Expensive chunks are scheduled first, but never ahead of the window they belong to."""
+    sim_chunks = get_sim_chunks(10, 2)
+    sim_allocation = {sim: "0" for sim in range(10)} | {3: "wincap", 8: "freegame", 9: "freegame"}
+    criteria_costs = {"wincap": 100.0, "freegame": 10.0, "0": 1.0}
+    assert order_chunks_by_cost(sim_chunks, sim_allocation, criteria_costs) == [1, 4, 0, 2, 3]
+    assert order_chunks_by_cost(sim_chunks, sim_allocation, criteria_costs, window=2) == [1, 0, 2, 3, 4]
+    assert order_chunks_by_cost(sim_chunks, sim_allocation, criteria_costs, window=3) == [1, 0, 2, 4, 3]
+    assert order_chunks_by_cost(sim_chunks, sim_allocation, {}) == [0, 1, 2, 3, 4]
+
+
+def run_sample_game(game_id, tmp_path, monkeypatch, num_sim_args, **kwargs):
+    """Library contents after simulating a sample game with create_books."""
+    gamestate = load_sample_game(game_id, tmp_path, monkeypatch)
+    create_books(gamestate, gamestate.config, dict(num_sim_args), **kwargs)
+    return read_library(gamestate)
+
+
+def test_threads_give_same_output(tmp_path, monkeypatch):
+    """Force records, lookup tables and books do not depend on the number of worker processes."""
+    num_sim_args = {"base": 60, "bonus": 30}
+    settings = {"batch_size": 10, "compress": True, "profiling": False}
+    expected = run_sample_game("0_0_lines", tmp_path / "single", monkeypatch, num_sim_args, threads=1, **settings)
+    output = run_sample_game("0_0_lines", tmp_path / "pool", monkeypatch, num_sim_args, threads=2, **settings)
+
+    for mode in num_sim_args:
+        assert f"forces/force_record_{mode}.json" in output
+        assert f"lookup_tables/lookUpTable_{mode}.csv" in output
+    assert output == expected
+
+
+def test_chunk_size_gives_same_output(tmp_path, monkeypatch):
+    """Simulations do not depend on the state left by earlier simulations of their chunk. The cluster game
+    resets its grid multipliers for every book."""
+    num_sim_args = {"base": 40}
+    settings = {"batch_size": 40, "threads": 1, "compress": True, "profiling": False}
+    expected = run_sample_game("0_0_cluster", tmp_path / "single", monkeypatch, num_sim_args, chunk_size=1, **settings)
+    output = run_sample_game("0_0_cluster", tmp_path / "batch", monkeypatch, num_sim_args, chunk_size=40, **settings)
+    assert output == expected
+
+
+def test_stats_only_gives_same_lookup_tables(tmp_path, monkeypatch, capsys):
+    """A stats_only run writes no books, with the lookup tables, force records and RTP of a full run."""
+    num_sim_args = {"base": 60, "bonus": 30}
+    settings = {"batch_size": 20, "threads": 2, "compress": True, "profiling": False}
+    expected = run_sample_game("0_0_lines", tmp_path / "books", monkeypatch, num_sim_args, **settings)
+    expected_rtp = [line for line in capsys.readouterr().out.splitlines() if "RTP" in line]
+    output = run_sample_game("0_0_lines", tmp_path / "stats", monkeypatch, num_sim_args, stats_only=True, **settings)
+    rtp = [line for line in capsys.readouterr().out.splitlines() if "RTP" in line]
+
+    book_files = [filename for filename in expected if os.path.basename(filename).startswith("books_")]
+    assert len(book_files) == len(num_sim_args)
+    assert not [filename for filename in output if os.path.basename(filename).startswith("books_")]
+    assert {filename: data for filename, data in expected.items() if filename not in book_files} == output
+    assert len(rtp) == len(num_sim_args) and rtp == expected_rtp
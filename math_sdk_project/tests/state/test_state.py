@@ -0,0 +1,32 @@
+"""Bet mode and distribution lookups of the gamestate."""
+
+from src.state.run_sims import copy_gamestate
+from tests.state.sample_game import load_sample_game
+
+
+def get_conditions(gamestate, betmode, criteria):
+    """Conditions of a distribution, looked up directly in the config."""
+    for d in gamestate.get_betmode(betmode).get_distributions():
+        if d._criteria == criteria:
+            return d._conditions
+
+
+def test_distribution_follows_betmode_and_criteria(tmp_path, monkeypatch):
+    """Conditions follow every switch of betmode or criteria, also on copied gamestates."""
+    gamestate = load_sample_game("0_0_lines", tmp_path, monkeypatch)
+    gamestate.betmode = "base"
+    gamestate.criteria = "freegame"
+    assert gamestate.get_current_distribution_conditions() is get_conditions(gamestate, "base", "freegame")
+
+    gamestate.criteria = "wincap"
+    assert gamestate.get_current_distribution_conditions() is get_conditions(gamestate, "base", "wincap")
+    gamestate.betmode = "bonus"
+    assert gamestate.get_current_distribution_conditions() is get_conditions(gamestate, "bonus", "wincap")
+    assert get_conditions(gamestate, "bonus", "wincap") is not get_conditions(gamestate, "base", "wincap")
+    assert gamestate.get_current_betmode() is gamestate.get_betmode("bonus")
+
+    copied = copy_gamestate(gamestate)
+    copied.betmode = "base"
+    copied.criteria = "freegame"
+    assert copied.get_current_distribution_conditions() is get_conditions(gamestate, "base", "freegame")
+    assert gamestate.get_current_distribution_conditions() is get_conditions(gamestate, "bonus", "wincap")
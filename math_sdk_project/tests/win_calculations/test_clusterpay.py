@@ -1,8 +1,9 @@
 """Test basic cluster-calculation functionality."""
 
+import random
 import pytest
 from tests.win_calculations.game_test_config import GamestateTest, create_blank_board
-from src.calculations.cluster import Cluster
+from src.calculations.cluster import Cluster, ClusterLabels
 
 
 class GameClusterConfig:
@@ -99,3 +100,39 @@ def test_basic_cluster(gamestate):
         clusters=clusters,
     )
     assert total_win == gamestate.config.paytable[(9, "H1")]
+
+
+def test_shared_wild_cluster_order(gamestate):
+    """Wilds join clusters of both neighbouring symbols; positions follow the depth-first search order."""
+    for idx, _ in enumerate(gamestate.board):
+        for idy, _ in enumerate(gamestate.board[idx]):
+            gamestate.board[idx][idy] = gamestate.create_symbol("H1" if idx < 3 else "H2")
+    gamestate.board[2][5] = gamestate.create_symbol("WM")
+    gamestate.board[3][5] = gamestate.create_symbol("WM")
+
+    clusters = Cluster.get_clusters(gamestate.board)
+    assert [len(c) for c in clusters["H1"]] == [19]
+    assert [len(c) for c in clusters["H2"]] == [19]
+    assert clusters["H1"][0][:8] == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (0, 2), (0, 3)]
+    assert (2, 5) in clusters["H2"][0] and (3, 5) in clusters["H1"][0]
+
+
+def test_large_board_cluster(gamestate):
+    """A single cluster covering a 12x12 board is found without recursion."""
+    board = [[gamestate.create_symbol("H1") for _ in range(12)] for _ in range(12)]
+    clusters = Cluster.get_clusters(board)
+    assert len(clusters["H1"]) == 1
+    assert sorted(clusters["H1"][0]) == [(reel, row) for reel in range(12) for row in range(12)]
+
+
+def test_incremental_clusters(gamestate):
+    """Cluster labels kept between partial board changes match a full evaluation."""
+    rng = random.Random(7)
+    names = ["H1", "H2", "WM", "X"]
+    board = [[gamestate.create_symbol(rng.choice(names)) for _ in range(6)] for _ in range(6)]
+    cluster_labels = ClusterLabels()
+    for _ in range(50):
+        assert list(cluster_labels.get_clusters(board).items()) == list(Cluster.get_clusters(board).items())
+        reel = rng.randrange(6)
+        for row in range(rng.randrange(1, 6)):
+            board[reel][row] = gamestate.create_symbol(rng.choice(names))
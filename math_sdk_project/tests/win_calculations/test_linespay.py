@@ -1,8 +1,11 @@
 """Test basic lines-calculation functionality."""
 
+import itertools
 import pytest
+import numpy as np
 from tests.win_calculations.game_test_config import GamestateTest, create_blank_board
-from src.calculations.lines import Lines
+from src.calculations.lines import Lines, LinePatternCache
+from src.config.compiled_model import get_compiled_model
 
 
 class GameLinesConfig:
@@ -122,3 +125,59 @@ def test_linespay_mult(gamestate):
 
     windata = Lines.get_lines(gamestate.board, gamestate.config)
     assert windata["totalWin"] == (gamestate.config.paytable[(5, "WM")] * sum([3, 3, 3, 3, 3]))
+
+
+def test_linespay_batch(gamestate):
+    "Batch evaluation of compiled boards matches get_lines."
+    model = get_compiled_model(gamestate.config)
+    rng = np.random.default_rng(0)
+    names = ["W", "H1", "WM", "X"]
+    boards = rng.choice([model.symbol_ids[name] for name in names], size=(200, 5, 5), p=[0.3, 0.4, 0.1, 0.2])
+    boards[0] = model.symbol_ids["W"]
+
+    batch = Lines.get_lines_batch(boards, gamestate.config)
+    assert batch.pays.shape == (200, len(gamestate.config.paylines))
+    for idx, symbol_ids in enumerate(boards):
+        gamestate.board = [[gamestate.create_symbol(model.symbol_names[s]) for s in reel] for reel in symbol_ids]
+        windata = Lines.get_lines(gamestate.board, gamestate.config)
+        assert Lines.get_batch_win_data(batch, idx, gamestate.board, gamestate.config) == windata
+
+
+def test_linespay_shared_prefixes(gamestate):
+    "Paylines sharing prefixes give the same wins as evaluating each line on its own."
+    gamestate.config.paylines = {
+        idx + 1: list(line) for idx, line in enumerate(itertools.product([0, 1], repeat=gamestate.config.num_reels))
+    }
+    model = get_compiled_model(gamestate.config)
+    rng = np.random.default_rng(1)
+    boards = rng.choice([model.symbol_ids[name] for name in ["W", "H1", "X"]], size=(50, 5, 5))
+    batch = Lines.get_lines_batch(boards, gamestate.config)
+    for idx, symbol_ids in enumerate(boards):
+        gamestate.board = [[gamestate.create_symbol(model.symbol_names[s]) for s in reel] for reel in symbol_ids]
+        windata = Lines.get_lines(gamestate.board, gamestate.config)
+        assert [win["meta"]["lineIndex"] for win in windata["wins"]] == [
+            line_id for line_id, pay in zip(gamestate.config.paylines, batch.pays[idx]) if pay > 0
+        ]
+        assert windata["totalWin"] == batch.pays[idx].sum()
+
+
+def test_linespay_pattern_cache(gamestate):
+    "Cached line patterns give the same wins, lines with symbol multipliers are always evaluated."
+    model = get_compiled_model(gamestate.config)
+    rng = np.random.default_rng(2)
+    symbol_ids = [model.symbol_ids[name] for name in ["W", "H1", "WM", "X"]]
+    boards = rng.choice(symbol_ids, size=(100, 5, 5), p=[0.3, 0.5, 0.05, 0.15])
+    pattern_cache = LinePatternCache()
+    for _ in range(2):
+        for symbol_ids in boards:
+            gamestate.board = [[gamestate.create_symbol(model.symbol_names[s]) for s in reel] for reel in symbol_ids]
+            windata = Lines.get_lines(gamestate.board, gamestate.config)
+            assert Lines.get_lines(gamestate.board, gamestate.config, pattern_cache=pattern_cache) == windata
+
+    stats = pattern_cache.get_stats()
+    assert stats["hits"] + stats["misses"] + stats["skipped"] == 200 * len(gamestate.config.paylines)
+    assert stats["skipped"] > 0
+    assert stats["hits"] >= stats["misses"] == stats["patterns"]
+    assert pattern_cache.hit_rate() == stats["hits"] / (stats["hits"] + stats["misses"])
+    assert pattern_cache.pop_stats() == stats
+    assert pattern_cache.get_stats()["hits"] == 0 and pattern_cache.get_stats()["patterns"] == stats["patterns"]
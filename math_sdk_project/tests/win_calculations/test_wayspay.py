@@ -1,8 +1,11 @@
 """Test basic ways-calculation functionality."""
 
 import pytest
+import numpy as np
 from tests.win_calculations.game_test_config import GamestateTest, create_blank_board
 from src.calculations.ways import Ways
+from src.config.compiled_model import get_compiled_model
+from utils.game_analytics.pilot_ways import get_pilot_ways_stats
 
 
 class GameWaysConfig:
@@ -136,3 +139,43 @@ def test_global_multiplier_strategy(gamestate):
     expected_win = base_win * global_mult
 
     assert windata["totalWin"] == expected_win, f"Expected {expected_win}, got {windata['totalWin']}"
+
+
+@pytest.mark.parametrize("strategy", ["symbol", "board", "global"])
+def test_batch_multiplier_strategies(gamestate, strategy):
+    """Count matrix evaluation reproduces get_ways_data for each multiplier strategy."""
+    board = setup_test_board(gamestate, wild_mults=(2, 3))
+    board[3][2] = gamestate.create_symbol("H1")
+    setattr(board[2][1], "multiplier", 4)
+    model = get_compiled_model(gamestate.config)
+    symbol_ids = np.array([[[model.symbol_ids[sym.name] for sym in reel] for reel in board]])
+    multipliers = np.array([[[getattr(sym, "multiplier", 0) for sym in reel] for reel in board]])
+
+    batch = Ways.get_ways_batch(symbol_ids, gamestate.config, multipliers, multiplier_strategy=strategy)
+    windata = Ways.get_ways_data(
+        config=gamestate.config, board=board, global_multiplier=5, multiplier_strategy=strategy
+    )
+    assert windata["totalWin"] > 0
+    assert (
+        Ways.get_batch_ways_data(
+            batch, 0, board, gamestate.config, global_multiplier=5, multiplier_strategy=strategy
+        )
+        == windata
+    )
+
+
+def test_pilot_ways_stats(gamestate):
+    """Pilot statistics of a reelstrip match get_ways_data on the same drawn boards."""
+    rng = np.random.default_rng(3)
+    gamestate.config.reels = {"BR0": [list(rng.choice(["W", "H1", "H2", "X"], size=20)) for _ in range(5)]}
+    stats = get_pilot_ways_stats(gamestate.config, "BR0", num_boards=300, batch_size=120, seed=4)
+
+    model = get_compiled_model(gamestate.config)
+    rng = np.random.default_rng(4)
+    boards = np.concatenate([model.sample_boards("BR0", size, rng) for size in [120, 120, 60]])
+    wins = []
+    for symbol_ids in boards:
+        board = [[gamestate.create_symbol(model.symbol_names[s]) for s in reel] for reel in symbol_ids]
+        wins.append(Ways.get_ways_data(gamestate.config, board)["totalWin"])
+    assert stats["rtp"] == pytest.approx(sum(wins) / 300)
+    assert stats["hitRate"] == pytest.approx(300 / np.count_nonzero(wins))
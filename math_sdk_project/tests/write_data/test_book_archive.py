@@ -0,0 +1,72 @@
+import io
+import json
+import zstandard as zstd
+
+from src.write_data.book_archive import SeekableBookWriter, BookArchiveReader, train_book_dictionary
+
+
+def write_test_archive(tmp_path, num_books, books_per_frame, chunk_size):
+    """Write sequential books in chunks, as received by the chunk merger."""
+    books = [{"id": i + 1, "payoutMultiplier": 10 * i, "events": [{"index": 0, "type": "win"}]} for i in range(num_books)]
+    books_filename = str(tmp_path / "books_base.jsonl.zst")
+    index_filename = str(tmp_path / "books_base.index")
+    with open(books_filename, "wb") as f:
+        archive = SeekableBookWriter(f, books_per_frame)
+        for start in range(0, num_books, chunk_size):
+            chunk = books[start : start + chunk_size]
+            archive.write_books("".join(json.dumps(b) + "\n" for b in chunk).encode("UTF-8"), [b["id"] for b in chunk])
+        archive.close()
+    archive.write_index(index_filename)
+    return books, books_filename, index_filename
+
+
+def test_archive_random_access(tmp_path):
+    """Any book is returned from the index, regardless of chunk and frame boundaries."""
+    books, books_filename, index_filename = write_test_archive(tmp_path, 23, books_per_frame=5, chunk_size=7)
+    reader = BookArchiveReader(books_filename, index_filename)
+
+    assert len(reader) == 23
+    assert len(reader.frame_offsets) == 6
+    for book in reversed(books):
+        assert reader.get_book(book["id"]) == book
+    assert 24 not in reader
+
+
+def test_archive_reads_as_single_stream(tmp_path):
+    """Concatenated frames are still a regular .jsonl.zst file."""
+    books, books_filename, _ = write_test_archive(tmp_path, 12, books_per_frame=4, chunk_size=5)
+    with open(books_filename, "rb") as f:
+        reader = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        lines = io.TextIOWrapper(reader, encoding="UTF-8").read().splitlines()
+
+    assert [json.loads(line) for line in lines] == books
+
+
+def test_archive_with_dictionary(tmp_path):
+    """Frames compressed with a trained dictionary are read back given the same dictionary."""
+    books = [
+        {
+            "id": i + 1,
+            "payoutMultiplier": 7 * i,
+            "events": [{"index": e, "type": "win", "amount": i * e} for e in range(i % 9)],
+        }
+        for i in range(600)
+    ]
+    book_lines = [(json.dumps(b) + "\n").encode("UTF-8") for b in books]
+    dictionary = train_book_dictionary(book_lines, 4096)
+    assert dictionary is not None
+    assert train_book_dictionary(book_lines[:2], 4096) is None
+
+    books_filename = str(tmp_path / "books_base.jsonl.zst")
+    index_filename = str(tmp_path / "books_base.index")
+    dictionary_filename = str(tmp_path / "books_base.dict")
+    with open(dictionary_filename, "wb") as f:
+        f.write(dictionary.as_bytes())
+    with open(books_filename, "wb") as f:
+        archive = SeekableBookWriter(f, 5, zstd.ZstdCompressor(level=9, dict_data=dictionary))
+        archive.write_books(b"".join(book_lines), [b["id"] for b in books])
+        archive.close()
+    archive.write_index(index_filename)
+
+    reader = BookArchiveReader(books_filename, index_filename, dictionary_filename)
+    assert [reader.get_book(book_id) for book_id in [600, 1, 333]] == [books[599], books[0], books[332]]
@@ -0,0 +1,104 @@
+import io
+import json
+import pytest
+import zstandard as zstd
+
+from src.write_data.book_codec import (
+    BookEncoder,
+    BookDecoder,
+    get_book_schema,
+    read_binary_books,
+    transcode_books,
+    write_binary_books,
+)
+
+
+class CodecDistribution:
+    """Criteria of a bet mode distribution."""
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+
+    def get_criteria(self):
+        return self.criteria
+
+
+class CodecBetMode:
+    """Distributions of a bet mode."""
+
+    def get_distributions(self):
+        return [CodecDistribution("wincap"), CodecDistribution("0")]
+
+
+class CodecConfig:
+    """Symbols, criteria and game types used in the book schema."""
+
+    def __init__(self):
+        self.basegame_type = "basegame"
+        self.freegame_type = "freegame"
+        self.bet_modes = [CodecBetMode()]
+        self.paytable = {(3, "H1"): 10, (3, "L1"): 1}
+        self.special_symbols = {"wild": ["W"], "scatter": ["S"]}
+
+
+def create_books(num_books):
+    """Books with repeated keys and symbol names, and values JSON treats specially."""
+    return [
+        {
+            "id": i + 1,
+            "payoutMultiplier": 10 * i,
+            "events": [
+                {"index": 0, "type": "reveal", "board": [[{"name": "H1"}, {"name": "W", "wild": True}]]},
+                {"index": 1, "type": "winInfo", "totalWin": 1.1 * i, "wins": [], "meta": {"positions": (0, 1)}},
+                {"index": 2, "type": "custom", "values": {1: None, "unknown": "new string"}},
+            ],
+            "criteria": "basegame",
+            "baseGameWins": 0.1 * i,
+            "freeGameWins": 0.0,
+        }
+        for i in range(num_books)
+    ]
+
+
+def test_schema_strings_are_shared():
+    """Schema strings are referenced instead of repeated, and books decode to the same JSON."""
+    schema = get_book_schema(CodecConfig())
+    assert {"index", "reveal", "H1", "wild", "basegame", "wincap"} <= set(schema)
+    encoder, decoder = BookEncoder(schema), BookDecoder(schema)
+    book = create_books(1)[0]
+    record = encoder.encode(book)
+    assert b"payoutMultiplier" not in record and b"reveal" not in record
+    assert json.dumps(decoder.decode(record[4:])) == json.dumps(book)
+
+
+def test_values_round_trip():
+    """Strings built at runtime still use the schema, and large or long values are kept exactly."""
+    schema = get_book_schema(CodecConfig())
+    encoder, decoder = BookEncoder(schema), BookDecoder(schema)
+    book = {
+        "".join(["rev", "eal"]): [-(2**70), -(2**40), -70000, -5, 0, 200, 2**31, 2**63, 1.5, -0.0],
+        "x" * 300: ["é" * 100, True, False, None, [1, "H1"]],
+        2: {str(i): i for i in range(300)},
+    }
+    record = encoder.encode(book)
+    assert b"reveal" not in record
+    decoded = decoder.decode(record[4:])
+    assert decoded == book and [type(value) for value in decoded["x" * 300]] == [str, bool, bool, type(None), list]
+    assert decoder.decode(encoder.encode({"positions": (1, 2)})[4:]) == {"positions": [1, 2]}
+    with pytest.raises(TypeError):
+        encoder.encode({"id": {1, 2}})
+
+
+@pytest.mark.parametrize("extension", [".bin", ".bin.zst"])
+def test_transcode_books(tmp_path, extension):
+    """Binary books transcode to the JSON lines of the original books."""
+    books = create_books(25)
+    binary_filename = str(tmp_path / f"books_base{extension}")
+    write_binary_books(books, binary_filename, get_book_schema(CodecConfig()))
+    assert [json.dumps(book) for book in read_binary_books(binary_filename)] == [json.dumps(b) for b in books]
+
+    output_filename = str(tmp_path / "books_base.jsonl.zst")
+    assert transcode_books(binary_filename, output_filename, compression_level=9, compression_threads=2) == 25
+    with open(output_filename, "rb") as f:
+        lines = io.TextIOWrapper(zstd.ZstdDecompressor().stream_reader(f), encoding="UTF-8").read().splitlines()
+    assert lines == [json.dumps(book) for book in books]
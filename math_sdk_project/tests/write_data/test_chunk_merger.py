@@ -0,0 +1,150 @@
+import os
+
+from src.config.output_filenames import OutputFiles
+from src.write_data.book_archive import BookArchiveReader
+from src.write_data.book_codec import BookEncoder, get_book_schema
+from src.write_data.book_writer import BookWriter
+from src.write_data.write_data import ChunkMerger
+from utils.rgs_verification import verify_books_and_payout_mults
+
+
+class MergerBetMode:
+    """Bet mode name used for the output filenames."""
+
+    def get_name(self):
+        return "base"
+
+    def get_distributions(self):
+        return []
+
+
+class MergerConfig:
+    """Settings read by OutputFiles, ChunkMerger and the binary book schema."""
+
+    def __init__(self):
+        self.game_id = "merger_test"
+        self.bet_modes = [MergerBetMode()]
+        self.output_regular_json = False
+        self.basegame_type = "basegame"
+        self.freegame_type = "freegame"
+        self.paytable = {}
+        self.special_symbols = {}
+
+
+class MergerGameState:
+    """Output files of a game written into a temporary games folder."""
+
+    def __init__(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("src.config.output_filenames.PATH_TO_GAMES", str(tmp_path))
+        self.config = MergerConfig()
+        self.output_files = OutputFiles(self.config)
+
+
+def create_chunk_outputs(num_books, chunk_size, books_per_frame=None, book_encoder=None):
+    """Compressed chunk outputs of sequential books, as returned by the simulation workers."""
+    books = [
+        {
+            "id": i + 1,
+            "payoutMultiplier": 10 * (i % 7),
+            "events": [{"index": e, "type": "win", "amount": i * e} for e in range(i % 5)],
+            "criteria": "basegame",
+            "baseGameWins": 0.1 * (i % 7),
+            "freeGameWins": 0.0,
+        }
+        for i in range(num_books)
+    ]
+    chunk_outputs = []
+    for chunk_index, start in enumerate(range(0, num_books, chunk_size)):
+        book_writer = BookWriter(compress=True, books_per_frame=books_per_frame, book_encoder=book_encoder)
+        for book in books[start : start + chunk_size]:
+            book_writer.write_book(book)
+        chunk_output = book_writer.close()
+        chunk_output["chunk_index"] = chunk_index
+        chunk_output["recorded_events"] = {}
+        chunk_outputs.append(chunk_output)
+    return books, chunk_outputs
+
+
+def test_dictionary_archive_is_not_published(tmp_path, monkeypatch):
+    """With a trained dictionary, the published books are still read by the RGS verification."""
+    gamestate = MergerGameState(tmp_path, monkeypatch)
+    books, chunk_outputs = create_chunk_outputs(2500, 300, books_per_frame=10)
+    merger = ChunkMerger(gamestate, "merger_test", "base", books_per_frame=10, dictionary_size=4096)
+    for chunk_output in reversed(chunk_outputs):
+        merger.add_chunk(chunk_output)
+    merger.close()
+
+    output_files = gamestate.output_files
+    payouts, num_events = verify_books_and_payout_mults(output_files.get_final_book_name("base", True))
+    assert payouts == [book["payoutMultiplier"] for book in books]
+    assert num_events == sum(len(book["events"]) for book in books)
+
+    published = BookArchiveReader(output_files.get_final_book_name("base", True), output_files.get_book_index_name("base"))
+    assert published.get_book(1234) == books[1233]
+    archive = BookArchiveReader(
+        output_files.get_dictionary_archive_name("base"),
+        output_files.get_dictionary_archive_index_name("base"),
+        output_files.get_book_dictionary_name("base"),
+    )
+    assert [archive.get_book(book_id) for book_id in [2500, 1, 1234]] == [books[2499], books[0], books[1233]]
+    assert os.path.getsize(output_files.get_dictionary_archive_name("base")) < os.path.getsize(
+        output_files.get_final_book_name("base", True)
+    )
+    with open(output_files.get_final_lookup_name("base"), "r", encoding="UTF-8") as f:
+        assert f.readline() == "1,1,0\n"
+
+
+def test_worker_frames_are_appended(tmp_path, monkeypatch):
+    """Chunks compressed by the workers are appended in simulation order, whatever their arrival order."""
+    gamestate = MergerGameState(tmp_path, monkeypatch)
+    books, chunk_outputs = create_chunk_outputs(95, 20)
+    merger = ChunkMerger(gamestate, "merger_test", "base")
+    for chunk_index in [2, 0, 4, 1, 3]:
+        merger.add_chunk(chunk_outputs[chunk_index])
+    merger.close()
+
+    payouts, _ = verify_books_and_payout_mults(gamestate.output_files.get_final_book_name("base", True))
+    assert payouts == [book["payoutMultiplier"] for book in books]
+
+
+def test_binary_books_are_published(tmp_path, monkeypatch):
+    """Binary books replace the published books of an earlier run once all chunks are written."""
+    gamestate = MergerGameState(tmp_path, monkeypatch)
+    published_filename = gamestate.output_files.get_final_book_name("base", True)
+    with open(published_filename, "wb") as f:
+        f.write(b"books of an earlier run")
+    encoder = BookEncoder(get_book_schema(gamestate.config))
+    books, chunk_outputs = create_chunk_outputs(45, 10, book_encoder=encoder)
+    merger = ChunkMerger(gamestate, "merger_test", "base", binary_books=True)
+    assert not os.path.exists(published_filename)
+    for chunk_output in reversed(chunk_outputs):
+        merger.add_chunk(chunk_output)
+    merger.close()
+
+    payouts, _ = verify_books_and_payout_mults(published_filename)
+    assert payouts == [book["payoutMultiplier"] for book in books]
+
+
+def test_stale_archive_files_are_removed(tmp_path, monkeypatch):
+    """Books written without frames remove the index and dictionary archive of an earlier archived run."""
+    gamestate = MergerGameState(tmp_path, monkeypatch)
+    output_files = gamestate.output_files
+    _, chunk_outputs = create_chunk_outputs(30, 10, books_per_frame=5)
+    merger = ChunkMerger(gamestate, "merger_test", "base", books_per_frame=5, dictionary_size=1024)
+    for chunk_output in chunk_outputs:
+        merger.add_chunk(chunk_output)
+    merger.close()
+    archive_filenames = [
+        output_files.get_book_index_name("base"),
+        output_files.get_book_dictionary_name("base"),
+        output_files.get_dictionary_archive_name("base"),
+        output_files.get_dictionary_archive_index_name("base"),
+    ]
+    assert all(os.path.exists(filename) for filename in archive_filenames)
+
+    _, chunk_outputs = create_chunk_outputs(30, 10)
+    merger = ChunkMerger(gamestate, "merger_test", "base")
+    for chunk_output in chunk_outputs:
+        merger.add_chunk(chunk_output)
+    merger.close()
+    assert not any(os.path.exists(filename) for filename in archive_filenames)
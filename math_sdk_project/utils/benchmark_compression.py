@@ -0,0 +1,121 @@
+"""
+Compare compression settings for simulation books: zstd level, worker threads and trained
+frame dictionaries for seekable archives. Reports compressed size, ratio and throughput.
+    Example (from the math_sdk_project folder):
+    python3 -m utils.benchmark_compression games/0_0_lines/library/publish_files/books_base.jsonl.zst
+    Without files, the books of every sample game with simulation outputs are used.
+"""
+
+import argparse
+import glob
+import io
+import os
+import time
+import zstandard as zstd
+from src.write_data.book_archive import SeekableBookWriter, train_book_dictionary
+from src.write_data.write_data import DICTIONARY_SAMPLE_BOOKS
+
+
+def read_book_lines(books_filename: str) -> list:
+    """Newline terminated books of a .jsonl.zst books file."""
+    with open(books_filename, "rb") as f:
+        data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+    return data.splitlines(keepends=True)
+
+
+def benchmark_stream(book_lines: list, level: int, threads: int) -> dict:
+    """Single stream compression, as used for regular .jsonl.zst books."""
+    start = time.perf_counter()
+    books = io.BytesIO()
+    with zstd.ZstdCompressor(level=level, threads=threads).stream_writer(books, closefd=False) as stream:
+        for line in book_lines:
+            stream.write(line)
+    return {"size": len(books.getvalue()), "seconds": time.perf_counter() - start, "trainSeconds": 0.0}
+
+
+def benchmark_frames(
+    book_lines: list, books_per_frame: int, level: int, threads: int, dictionary_size: int = None
+) -> dict:
+    """Seekable archive frames, optionally with a dictionary trained as in write_data.ChunkMerger.
+    The size includes the dictionary, training time is reported separately."""
+    start = time.perf_counter()
+    dictionary = None
+    if dictionary_size:
+        dictionary = train_book_dictionary(book_lines[:DICTIONARY_SAMPLE_BOOKS], dictionary_size)
+    train_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    books = io.BytesIO()
+    compressor = zstd.ZstdCompressor(level=level, threads=threads, dict_data=dictionary)
+    archive = SeekableBookWriter(books, books_per_frame, compressor)
+    archive.write_books(b"".join(book_lines), list(range(1, len(book_lines) + 1)))
+    archive.close()
+    return {
+        "size": len(books.getvalue()) + (len(dictionary.as_bytes()) if dictionary is not None else 0),
+        "seconds": time.perf_counter() - start,
+        "trainSeconds": train_seconds,
+    }
+
+
+def benchmark_books(
+    books_filename: str, levels: list, threads: list, books_per_frame: int, dictionary_size: int
+) -> list:
+    """Results of every setting for a single books file."""
+    book_lines = read_book_lines(books_filename)
+    raw_size = sum(len(line) for line in book_lines)
+    results = []
+    for level in levels:
+        for num_threads in threads:
+            settings = [("stream", benchmark_stream(book_lines, level, num_threads))]
+            settings.append(
+                (f"frames/{books_per_frame}", benchmark_frames(book_lines, books_per_frame, level, num_threads))
+            )
+            if dictionary_size:
+                settings.append(
+                    (
+                        f"frames/{books_per_frame}+dict",
+                        benchmark_frames(book_lines, books_per_frame, level, num_threads, dictionary_size),
+                    )
+                )
+            for name, result in settings:
+                results.append(
+                    {
+                        "format": name,
+                        "level": level,
+                        "threads": num_threads,
+                        "size": result["size"],
+                        "ratio": raw_size / result["size"],
+                        "mbPerSecond": raw_size / 1e6 / result["seconds"],
+                        "trainSeconds": result["trainSeconds"],
+                    }
+                )
+    return results
+
+
+def print_results(books_filename: str, results: list) -> None:
+    """Table of results for a books file."""
+    print(f"\n{books_filename}")
+    print(f"{'format':<20}{'level':>6}{'threads':>8}{'size':>14}{'ratio':>8}{'MB/s':>9}{'train s':>9}")
+    for r in results:
+        print(
+            f"{r['format']:<20}{r['level']:>6}{r['threads']:>8}{r['size']:>14}{r['ratio']:>8.2f}"
+            f"{r['mbPerSecond']:>9.1f}{r['trainSeconds']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="Compressed .jsonl.zst books files.")
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 3, 9, 19])
+    parser.add_argument("--threads", nargs="+", type=int, default=[0, 4])
+    parser.add_argument("--books-per-frame", type=int, default=20)
+    parser.add_argument("--dictionary-size", type=int, default=112640)
+    args = parser.parse_args()
+
+    files = args.files or sorted(
+        glob.glob(os.path.join("games", "*", "library", "publish_files", "books_*.jsonl.zst"))
+    )
+    for filename in files:
+        print_results(
+            filename,
+            benchmark_books(filename, args.levels, args.threads, args.books_per_frame, args.dictionary_size),
+        )
@@ -0,0 +1,40 @@
+"""Quick line-pay estimates straight from the reelstrips, without running simulations."""
+
+import numpy as np
+from src.calculations.lines import Lines
+from src.config.compiled_model import get_compiled_model
+
+
+def get_pilot_line_stats(
+    config: object,
+    reelstrip_id: str,
+    num_boards: int = int(1e6),
+    batch_size: int = int(1e5),
+    seed: int = 0,
+    wild_key: str = "wild",
+    wild_sym: str = "W",
+) -> dict:
+    """
+    Average line pay, hit-rate and pay split per symbol for uniformly drawn boards of a reelstrip.
+    Boards are evaluated in batches with Lines.get_lines_batch, ignoring multipliers, which is
+    useful when tuning reelstrips before running full simulations.
+    """
+    model = get_compiled_model(config)
+    rng = np.random.default_rng(seed)
+    total_pay, num_hits = 0.0, 0
+    symbol_pays = np.zeros(len(model.symbol_names))
+    for start in range(0, num_boards, batch_size):
+        boards = model.sample_boards(reelstrip_id, min(batch_size, num_boards - start), rng)
+        batch = Lines.get_lines_batch(boards, config, wild_key=wild_key, wild_sym=wild_sym)
+        board_pays = batch.pays.sum(axis=1)
+        total_pay += board_pays.sum()
+        num_hits += np.count_nonzero(board_pays)
+        np.add.at(symbol_pays, batch.symbol_ids, batch.pays)
+
+    return {
+        "rtp": float(total_pay / num_boards),
+        "hitRate": num_boards / int(num_hits) if num_hits > 0 else 0,
+        "symbolRtp": {
+            name: float(symbol_pays[idx] / num_boards) for idx, name in enumerate(model.symbol_names) if symbol_pays[idx] > 0
+        },
+    }
@@ -0,0 +1,43 @@
+"""Quick ways-pay estimates straight from the reelstrips, without running simulations."""
+
+import numpy as np
+from src.calculations.ways import Ways
+from src.config.compiled_model import get_compiled_model
+
+
+def get_pilot_ways_stats(
+    config: object,
+    reelstrip_id: str,
+    num_boards: int = int(1e6),
+    batch_size: int = int(1e5),
+    seed: int = 0,
+    wild_key: str = "wild",
+) -> dict:
+    """
+    Average ways pay, hit-rate and pay split per symbol for uniformly drawn boards of a reelstrip.
+    Boards are evaluated in batches with Ways.get_ways_batch, ignoring multipliers, which is
+    useful when tuning reelstrips before running full simulations.
+    """
+    model = get_compiled_model(config)
+    rng = np.random.default_rng(seed)
+    total_pay, num_hits = 0.0, 0
+    symbol_pays = np.zeros(len(model.symbol_names))
+    symbol_ids = np.arange(len(model.symbol_names))
+    for start in range(0, num_boards, batch_size):
+        boards = model.sample_boards(reelstrip_id, min(batch_size, num_boards - start), rng)
+        batch = Ways.get_ways_batch(boards, config, wild_key=wild_key)
+        # Only symbols on the first reel win, as in get_ways_data
+        on_first_reel = batch.first_rows < boards.shape[2]
+        pays = np.where(on_first_reel, model.pay_array[symbol_ids, batch.kinds] * batch.ways, 0.0)
+        board_pays = pays.sum(axis=1)
+        total_pay += board_pays.sum()
+        num_hits += np.count_nonzero(board_pays)
+        symbol_pays += pays.sum(axis=0)
+
+    return {
+        "rtp": float(total_pay / num_boards),
+        "hitRate": num_boards / int(num_hits) if num_hits > 0 else 0,
+        "symbolRtp": {
+            name: float(symbol_pays[idx] / num_boards) for idx, name in enumerate(model.symbol_names) if symbol_pays[idx] > 0
+        },
+    }
@@ -122,7 +122,7 @@ def verify_books_and_payout_mults(books_filename: str) -> list:
     total_num_events = 0
     with open(books_filename, "rb") as f:
         decompressor = zst.ZstdDecompressor()
-        with decompressor.stream_reader(f) as reader:
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
             txt_stream = TextIOWrapper(reader, encoding="UTF-8")
             for line in txt_stream:
                 line = line.strip()